@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.crypto import salted_hmac
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+USERNAME_CLAIM = 'username'
+STAMP_CLAIM = 'auth_stamp'
+
+# Поля пользователя, от которых зависят выданные ему токены.
+STAMP_FIELDS = ('role', 'is_superuser', 'is_active', 'password')
+
+
+def make_auth_stamp(role, is_superuser, is_active, password):
+    """Отпечаток полей пользователя; меняется при смене роли или пароля."""
+    return salted_hmac(
+        'api.authentication.auth_stamp',
+        f'{role}:{is_superuser}:{is_active}:{password}'
+    ).hexdigest()[:16]
+
+
+def get_stamp_cache():
+    """Кэш отпечатков, общий для всех процессов (см. api.checks)."""
+    return caches[settings.AUTH_STAMP_CACHE_ALIAS]
+
+
+def stamp_cache_key(user_id):
+    return f'auth:stamp:{user_id}'
+
+
+def get_auth_stamp(user_id):
+    """Текущий отпечаток пользователя из кэша, при промахе из БД.
+
+    Для удалённого или неактивного пользователя возвращается ''.
+    """
+    cache = get_stamp_cache()
+    key = stamp_cache_key(user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        values = User.objects.filter(pk=user_id).values_list(
+            *STAMP_FIELDS
+        ).first()
+        stamp = make_auth_stamp(*values) if values and values[2] else ''
+        cache.set(key, stamp, timeout=settings.AUTH_STAMP_CACHE_TIMEOUT)
+    return stamp
+
+
+def invalidate_auth_stamp(user_id):
+    """Сбрасываем отпечаток после коммита, как версии в api.cache."""
+    transaction.on_commit(
+        lambda: get_stamp_cache().delete(stamp_cache_key(user_id))
+    )
+
+
+def invalidate_auth_stamps(user_ids):
+    """Сбрасываем отпечатки пользователей, изменённых без сигналов."""
+    keys = [stamp_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: get_stamp_cache().delete_many(keys))
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью пользователя в claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[USERNAME_CLAIM] = user.username
+        token[ROLE_CLAIM] = user.role
+        token[SUPERUSER_CLAIM] = user.is_superuser
+        token[STAMP_CLAIM] = make_auth_stamp(
+            *(getattr(user, field) for field in STAMP_FIELDS)
+        )
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, собранный из claims токена без запроса к БД.
+
+    Повторяет атрибуты users.models.User, нужные пермишенам.
+    """
+
+    @property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @property
+    def is_superuser(self):
+        return self.token[SUPERUSER_CLAIM]
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без загрузки пользователя из БД.
+
+    Токен отзывается, если отпечаток пользователя в кэше изменился.
+    Токены без claims роли проверяются по БД, как раньше.
+    """
+
+    def get_user(self, validated_token):
+        if STAMP_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = RoleTokenUser(validated_token)
+        if get_auth_stamp(user.id) != validated_token[STAMP_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked'
+            )
+        return user
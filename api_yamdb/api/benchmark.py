@@ -0,0 +1,174 @@
+"""Замеры задержки и числа запросов к БД для маршрутов api/urls.py."""
+import random
+import time
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken
+from reviews.datagen import WORDS
+from reviews.models import Comment, Genre, Review, Title
+from users.models import User
+
+BENCHMARK_ADMIN = 'bench-admin'
+CONTEXTS = 200
+PERCENTILES = (50, 90, 99)
+
+# Имя замера, шаблон пути и параметры запроса. Шаблон заполняется
+# случайным контекстом из build_contexts.
+ROUTES = (
+    ('titles-list', '/api/v1/titles/', {}),
+    ('titles-list?genre', '/api/v1/titles/', {'genre': '{genre}'}),
+    ('titles-list?search', '/api/v1/titles/', {'search': '{word}'}),
+    ('titles-list?cursor', '/api/v1/titles/', {'cursor': ''}),
+    ('titles-list?offset', '/api/v1/titles/', {'offset': '{offset}'}),
+    ('titles-detail', '/api/v1/titles/{title_id}/', {}),
+    ('titles-stats', '/api/v1/titles/{title_id}/stats/', {}),
+    ('categories-list', '/api/v1/categories/', {}),
+    ('genres-list', '/api/v1/genres/', {}),
+    ('title_reviews-list', '/api/v1/titles/{title_id}/reviews/', {}),
+    (
+        'title_reviews-list?search',
+        '/api/v1/titles/{title_id}/reviews/',
+        {'search': '{word}'}
+    ),
+    (
+        'title_reviews-detail',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        {}
+    ),
+    (
+        'review_comments-list',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        {}
+    ),
+    (
+        'review_comments-detail',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/',
+        {}
+    ),
+    ('users-list', '/api/v1/users/', {}),
+    ('users-detail', '/api/v1/users/{username}/', {}),
+    ('users-me', '/api/v1/users/me/', {}),
+)
+
+
+def percentile(values, percent):
+    """Процентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[index]
+
+
+class RandomPicker:
+    """Случайные объекты модели без ORDER BY RANDOM() по всей таблице.
+
+    Берётся первый объект с pk не меньше случайного в диапазоне pk.
+    """
+
+    def __init__(self, queryset, rng):
+        self.queryset = queryset.order_by('pk')
+        self.rng = rng
+        pks = self.queryset.values_list('pk', flat=True)
+        self.first, self.last = pks.first(), pks.last()
+
+    def pick(self):
+        if self.first is None:
+            return None
+        return self.queryset.filter(
+            pk__gte=self.rng.randint(self.first, self.last)
+        ).first()
+
+
+def build_contexts(rng, count=CONTEXTS):
+    """Случайные объекты для подстановки в шаблоны путей."""
+    comments = RandomPicker(
+        Comment.objects.filter(review__isnull=False).select_related('review'),
+        rng
+    )
+    reviews = RandomPicker(Review.objects.all(), rng)
+    users = RandomPicker(User.objects.all(), rng)
+    titles = Title.objects.count()
+    contexts = []
+    for _ in range(count):
+        comment = comments.pick()
+        review = comment.review if comment else reviews.pick()
+        title_id = review.title_id if review else 0
+        user = users.pick()
+        genre = Genre.objects.filter(titles_genres__title_id=title_id).first()
+        contexts.append({
+            'title_id': title_id,
+            'review_id': review.pk if review else 0,
+            'comment_id': comment.pk if comment else 0,
+            'username': user.username if user else BENCHMARK_ADMIN,
+            'genre': genre.slug if genre else '',
+            'word': rng.choice(WORDS),
+            'offset': rng.randint(0, max(0, titles - 10)),
+        })
+    return contexts
+
+
+def get_admin_client():
+    admin, _ = User.objects.get_or_create(
+        username=BENCHMARK_ADMIN,
+        defaults={'email': 'bench-admin@yamdb.fake', 'role': User.ADMIN}
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+    )
+    return client
+
+
+def run_benchmark(requests=50, warmup=5, seed=0, cold_cache=False,
+                  routes=None, progress=None):
+    """Замеряем каждый маршрут requests раз после warmup прогонов.
+
+    Запросы идут от администратора, поэтому кэш ответов анонимным
+    не используется. При cold_cache кэши очищаются перед каждым
+    запросом. Возвращает статистику по имени замера.
+    """
+    rng = random.Random(seed)
+    client = get_admin_client()
+    contexts = build_contexts(rng)
+    results = {}
+    for name, path, params in ROUTES:
+        if routes and name not in routes:
+            continue
+        latencies, queries, statuses = [], [], set()
+        for index in range(warmup + requests):
+            context = rng.choice(contexts)
+            url = path.format(**context)
+            data = {
+                key: value.format(**context) for key, value in params.items()
+            }
+            if cold_cache:
+                for cache in caches.all():
+                    cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url, data)
+                elapsed = time.perf_counter() - start
+            if index < warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+        results[name] = {
+            'requests': requests,
+            'statuses': sorted(statuses),
+            'mean_ms': sum(latencies) / len(latencies),
+            **{
+                f'p{percent}_ms': percentile(latencies, percent)
+                for percent in PERCENTILES
+            },
+            'max_ms': max(latencies),
+            'mean_queries': sum(queries) / len(queries),
+            'max_queries': max(queries),
+        }
+        if progress:
+            progress(name, results[name])
+    return results
@@ -0,0 +1,166 @@
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# Последняя загруженная в процесс версия каталога:
+# {имя: (версия, каталог, время загрузки)}.
+_local_catalogs = {}
+
+
+def get_cache():
+    """Кэш, в котором хранятся версии и каталоги."""
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def make_key(key, key_prefix, version):
+    """Ключ кэша с именем БД.
+
+    Тестовая БД бенчмарка и тестов не должна делить версии и каталоги
+    с рабочей, даже если у них общая папка кэша.
+    """
+    db_name = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    return f'{key_prefix}:{db_name}:{version}:{key}'
+
+
+def new_version():
+    """Новая версия: время и случайная часть.
+
+    Не совпадает ни с одной из прежних версий, даже если ключ был
+    вытеснен или два процесса меняют версию одновременно.
+    """
+    return f'{time.time_ns()}-{secrets.token_hex(4)}'
+
+
+def get_version(name):
+    """Текущая версия ресурса name, при промахе создаётся новая."""
+    cache = get_cache()
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(names):
+    """Версии нескольких ресурсов за одно обращение к кэшу."""
+    cache = get_cache()
+    keys = {f'version:{name}': name for name in names}
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(name):
+    """Меняем версию ресурса name после коммита транзакции.
+
+    Если сменить версию внутри транзакции, другой процесс успеет
+    прочитать старые строки и закэшировать их под новой версией.
+    Вне транзакции версия меняется сразу.
+    """
+    transaction.on_commit(lambda: set_new_version(name))
+
+
+def set_new_version(name):
+    """Меняем версию ресурса name, делая устаревшими его кэши.
+
+    Новая версия записывается целиком, а не через incr: в файловом
+    кэше incr - это отдельные get и set, и при одновременной смене
+    версии двумя процессами одна из них терялась бы.
+    Заодно запоминаем время изменения для заголовка Last-Modified.
+    """
+    cache = get_cache()
+    cache.set(f'modified:{name}', int(time.time()), timeout=None)
+    cache.set(f'version:{name}', new_version(), timeout=None)
+
+
+def get_stamps(names):
+    """Версии ресурсов names и время последнего изменения любого из них.
+
+    Если время изменения неизвестно, например после вытеснения ключа,
+    берётся текущее время.
+    """
+    names = list(names)
+    versions = get_versions(names)
+    modified = get_cache().get_many(f'modified:{name}' for name in names)
+    if len(modified) < len(names):
+        last_modified = int(time.time())
+        get_cache().set_many({
+            f'modified:{name}': last_modified for name in names
+            if f'modified:{name}' not in modified
+        }, timeout=None)
+    else:
+        last_modified = max(modified.values(), default=0)
+    return versions, last_modified
+
+
+def catalog_name(model):
+    return f'catalog:{model._meta.label_lower}'
+
+
+def get_catalog(model):
+    """Словарь slug -> объект для модели Категорий или Жанров.
+
+    Каталог берётся из памяти процесса, пока его версия совпадает с
+    версией в общем кэше и он не старше CATALOG_CACHE_TIMEOUT, иначе из
+    общего кэша или из БД. Срок нужен на случай, если версия в кэше
+    потерялась или кэш не общий для процессов.
+    """
+    name = catalog_name(model)
+    version = get_version(name)
+    local = _local_catalogs.get(name)
+    if (
+        local is not None
+        and local[0] == version
+        and time.monotonic() - local[2] < settings.CATALOG_CACHE_TIMEOUT
+    ):
+        return local[1]
+    cache = get_cache()
+    key = f'{name}:{version}'
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = {obj.slug: obj for obj in model.objects.all()}
+        cache.set(key, catalog, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    _local_catalogs[name] = (version, catalog, time.monotonic())
+    return catalog
+
+
+def invalidate_catalog(model):
+    """Сбрасываем каталог модели после создания или удаления записи."""
+    bump_version(catalog_name(model))
+
+
+def object_version_names(model, pk):
+    """Версии объекта: своя и общая для всех объектов model."""
+    label = model._meta.label_lower
+    return [f'object:{label}:{pk}', f'object:{label}:*']
+
+
+def invalidate_object(model, pk):
+    """Сбрасываем кэши и ETag, построенные по объекту model с pk."""
+    bump_version(object_version_names(model, pk)[0])
+
+
+def invalidate_objects(model):
+    """Сбрасываем кэши всех объектов model после массового UPDATE."""
+    bump_version(object_version_names(model, '*')[1])
+    invalidate_table(model._meta.db_table)
+
+
+def table_version_name(db_table):
+    return f'table:{db_table}'
+
+
+def table_version_names(*models):
+    return [table_version_name(model._meta.db_table) for model in models]
+
+
+def invalidate_table(db_table):
+    """Сбрасываем кэши, построенные по содержимому таблицы db_table."""
+    bump_version(table_version_name(db_table))
@@ -0,0 +1,27 @@
+"""Проверки настроек, запускаются командой check и при старте сервера."""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_auth_stamp_cache(app_configs, **kwargs):
+    """Отпечатки пользователей должны быть общими для всех процессов.
+
+    Иначе отзыв токенов при смене роли или пароля срабатывает только
+    в процессе, который сохранил пользователя.
+    """
+    alias = settings.AUTH_STAMP_CACHE_ALIAS
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f'Кэш {alias!r} для AUTH_STAMP_CACHE_ALIAS хранится в памяти '
+            'процесса, и отозванные токены продолжат работать в других '
+            'процессах.',
+            hint='Укажите общий кэш: файловый, redis или memcached.',
+            id='api.E001',
+        )]
+    return []
@@ -8,7 +8,18 @@ ROLE_MAX_LENGTH = 20
 EMAIL_MAX_LENGTH = 254
 CODE_MAX_LENGTH = 250
 
+# Константы для модели OutgoingEmail.
+EMAIL_SUBJECT_MAX_LENGTH = 255
+EMAIL_SEND_MAX_ATTEMPTS = 5
+# Через сколько секунд письмо, взятое упавшим обработчиком, берётся снова.
+EMAIL_CLAIM_TIMEOUT = 10 * 60
+# Пауза в секундах перед второй попыткой отправки, дальше она удваивается.
+EMAIL_RETRY_DELAY = 30
+
 # Константы для: ReviewSerializer, SignUpSerializer,TokenSerializer
 USERNAME_MAX_LENGTH = 150
 MAX_SCORE = 10
 MIN_SCORE = 1
+
+# Наибольшее число результатов полнотекстового поиска.
+SEARCH_RESULTS_LIMIT = 1000
@@ -1,6 +1,10 @@
+from django.db.models import Case, IntegerField, When
 from django_filters.rest_framework import CharFilter, FilterSet
+from rest_framework.filters import BaseFilterBackend
 
+from api.const import SEARCH_RESULTS_LIMIT
 from reviews.models import Title
+from reviews.search import search
 
 
 class TitleFilters(FilterSet):
@@ -13,3 +17,34 @@ class TitleFilters(FilterSet):
     class Meta:
         model = Title
         fields = ('year', 'genre', 'name', 'category')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру search, лучшие совпадения первыми.
+
+    Вьюсет может ограничить поиск методом get_search_scope,
+    например Отзывами одного произведения.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        get_scope = getattr(view, 'get_search_scope', None)
+        ids = search(
+            queryset.model,
+            query,
+            scope=get_scope() if get_scope else None,
+            limit=SEARCH_RESULTS_LIMIT
+        )
+        if not ids:
+            return queryset.none()
+        return queryset.filter(pk__in=ids).order_by(
+            Case(
+                *(When(pk=pk, then=rank) for rank, pk in enumerate(ids)),
+                output_field=IntegerField()
+            ),
+            'id'
+        )
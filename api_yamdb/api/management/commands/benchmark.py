@@ -0,0 +1,156 @@
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.benchmark import ROUTES, run_benchmark
+from reviews.datagen import generate_dataset
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = ('Бенчмарк маршрутов API на сгенерированном наборе данных.\n'
+            'Создаёт тестовую БД (настройки DATABASES[...]["TEST"]), '
+            'заполняет её и сохраняет задержки и число запросов в JSON.\n'
+            'Пример команды: python manage.py benchmark --titles 100000 '
+            '--reviews 5000000 --users 50000 --output bench.json')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=None,
+            help='По умолчанию вдвое меньше Отзывов'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Сколько замеров на маршрут'
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--route',
+            action='append',
+            dest='routes',
+            choices=[name for name, _, _ in ROUTES],
+            help='Замерить только этот маршрут, можно несколько раз'
+        )
+        parser.add_argument(
+            '--cold-cache',
+            action='store_true',
+            help='Очищать кэши перед каждым запросом'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Не удалять тестовую БД и не заполнять её повторно'
+        )
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument(
+            '--compare',
+            default=None,
+            help='JSON прошлого запуска для сравнения'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть больше нуля')
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            dataset = self.seed(options)
+            results = run_benchmark(
+                requests=options['requests'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                cold_cache=options['cold_cache'],
+                routes=options['routes'],
+                progress=self.route_progress
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+        report = {
+            'commit': self.get_commit(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'vendor': connection.vendor,
+            'options': {
+                key: options[key] for key in (
+                    'requests', 'warmup', 'seed', 'cold_cache'
+                )
+            },
+            'dataset': dataset,
+            'routes': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты сохранены в {options["output"]}'
+        ))
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def seed(self, options):
+        if options['keepdb'] and Title.objects.exists():
+            self.stdout.write('Используем уже заполненную тестовую БД')
+            return {'reused': True}
+        start = time.perf_counter()
+        counts = generate_dataset(
+            titles=options['titles'],
+            reviews=options['reviews'],
+            users=options['users'],
+            comments=options['comments'],
+            seed=options['seed'],
+            progress=self.seed_progress
+        )
+        self.stdout.write(
+            f'Набор данных создан за {time.perf_counter() - start:.1f} с'
+        )
+        return counts
+
+    def seed_progress(self, label, created):
+        self.stdout.write(f'{label}: создано {created}')
+
+    def route_progress(self, name, stats):
+        self.stdout.write(
+            f'{name:<28} p50 {stats["p50_ms"]:8.2f} мс  '
+            f'p99 {stats["p99_ms"]:8.2f} мс  '
+            f'запросов к БД {stats["mean_queries"]:.1f}'
+        )
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as file:
+            previous = json.load(file)
+        self.stdout.write(f'Сравнение с {previous.get("commit")}:')
+        for name, stats in results.items():
+            old = previous['routes'].get(name)
+            if old is None:
+                continue
+            self.stdout.write(
+                f'{name:<28} p50 {old["p50_ms"]:8.2f} -> '
+                f'{stats["p50_ms"]:8.2f} мс  '
+                f'запросов к БД {old["mean_queries"]:.1f} -> '
+                f'{stats["mean_queries"]:.1f}'
+            )
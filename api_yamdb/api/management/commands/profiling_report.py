@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.profiling import collect_report, reset_report
+
+COLUMNS = ('wall_ms', 'db_ms', 'serializer_ms', 'queries', 'response_bytes')
+
+
+class Command(BaseCommand):
+    help = ('Выводит статистику профилирования запросов по маршрутам.\n'
+            'Статистика берётся из общего кэша, поэтому для нескольких '
+            'процессов нужен общий бэкенд кэша.\n'
+            'Пример команды: python manage.py profiling_report --top 10')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=None,
+            help='Сколько самых медленных маршрутов вывести'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Вывести полный отчёт в JSON'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Сбросить статистику после вывода'
+        )
+
+    def handle(self, *args, **options):
+        report = collect_report()
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            self.write_table(report, options['top'])
+        if options['reset']:
+            reset_report()
+
+    def write_table(self, report, top):
+        routes = sorted(
+            report['routes'].items(),
+            key=lambda item: item[1]['wall_ms']['sum'] / item[1]['requests'],
+            reverse=True
+        )[:top]
+        if not routes:
+            self.stdout.write('Нет данных профилирования')
+            return
+        self.stdout.write(
+            f'{"маршрут":<40}{"запросы":>9}{"сверх":>7}'
+            + ''.join(f'{f"ср. {name}":>20}' for name in COLUMNS)
+        )
+        for route, stats in routes:
+            self.stdout.write(
+                f'{route:<40}{stats["requests"]:>9}{stats["over_budget"]:>7}'
+                + ''.join(
+                    f'{stats[name]["sum"] / stats[name]["count"]:>20.2f}'
+                    for name in COLUMNS
+                )
+            )
+        for item in report['flagged']:
+            self.stdout.write(self.style.WARNING(
+                f'{item["path"]} ({item["route"]}): '
+                f'{item["queries"]} запросов к БД, {item["wall_ms"]} мс'
+            ))
@@ -0,0 +1,58 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from api.profiling import RequestRecord, current_record, store
+
+logger = logging.getLogger('api.profiling')
+
+
+class ProfilingMiddleware:
+    """Профилирует запросы, если включён PROFILING_ENABLED.
+
+    Запросы, сделавшие больше PROFILING_QUERY_BUDGET запросов к БД,
+    попадают в отчёт, в лог api.profiling и получают заголовок
+    X-Query-Budget-Exceeded.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        record = RequestRecord()
+        token = current_record.set(record)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(record.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_record.reset(token)
+        wall_time = time.perf_counter() - start
+        match = request.resolver_match
+        route = (
+            f'{request.method} {match.view_name if match else "unresolved"}'
+        )
+        size = (
+            len(response.content)
+            if not getattr(response, 'streaming', False) else 0
+        )
+        if store.add(route, request.path, record, wall_time, size):
+            response['X-Query-Budget-Exceeded'] = str(record.queries)
+            logger.warning(
+                '%s (%s): %s запросов к БД при бюджете %s',
+                request.path,
+                route,
+                record.queries,
+                settings.PROFILING_QUERY_BUDGET
+            )
+        return response
@@ -0,0 +1,263 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api.cache import get_stamps
+
+
+class ConditionalListMixin:
+    """ETag и Last-Modified для list по версиям ресурсов.
+
+    Вьюсет перечисляет в get_version_names имена версий из api.cache,
+    от которых зависит ответ. Валидаторы вычисляются до запроса к БД,
+    поэтому на If-None-Match и If-Modified-Since с совпавшей версией
+    ответ 304 возвращается без выборки и сериализации.
+
+    При cache_anonymous_responses готовые JSON-ответы анонимным
+    пользователям хранятся в кэше RESPONSE_CACHE_ALIAS под ключом
+    из ETag, поэтому смена любой версии ресурса делает их устаревшими.
+
+    При vary_on_user ответ зависит от пользователя (например, поле
+    can_edit), и его id и роль входят в ETag.
+    """
+
+    cache_anonymous_responses = False
+    vary_on_user = False
+
+    def get_version_names(self):
+        raise NotImplementedError
+
+    def get_normalized_path(self, request):
+        """Путь с параметрами запроса в отсортированном порядке."""
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return f'{request.path}?{query}' if query else request.path
+
+    def get_user_key(self, request):
+        user = request.user
+        if not self.vary_on_user or not user.is_authenticated:
+            return ''
+        return f'{user.id}:{user.role}:{user.is_superuser}'
+
+    def get_validators(self, request):
+        versions, last_modified = get_stamps(self.get_version_names())
+        # Ссылки next/previous в ответе абсолютные, поэтому схема и хост
+        # входят в ETag и ключ кэша ответов.
+        payload = ':'.join([
+            request.scheme,
+            request.get_host(),
+            self.get_normalized_path(request),
+            request.accepted_renderer.format,
+            self.get_user_key(request),
+            *(str(version) for version in versions)
+        ])
+        etag = quote_etag(hashlib.md5(payload.encode()).hexdigest())
+        return etag, last_modified
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        cache_key = None
+        if (
+            self.cache_anonymous_responses
+            and request.user.is_anonymous
+            and request.accepted_renderer.format == 'json'
+        ):
+            cache_key = f'response:{etag}'
+            cached = caches[settings.RESPONSE_CACHE_ALIAS].get(cache_key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+                return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            if cache_key is not None:
+                response.add_post_render_callback(
+                    lambda rendered: self.store_response(cache_key, rendered)
+                )
+        return response
+
+    def store_response(self, cache_key, response):
+        caches[settings.RESPONSE_CACHE_ALIAS].set(
+            cache_key,
+            (response.content, response['Content-Type']),
+            timeout=settings.RESPONSE_CACHE_TIMEOUT
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """ETag и Last-Modified для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class BulkMixin:
+    """Массовое создание списком в теле POST и массовый PATCH.
+
+    Объекты для PATCH /bulk/ ищутся по полю bulk_lookup_field одним
+    запросом. Все элементы проверяются до записи: при любой ошибке
+    ничего не сохраняется, а в ответе ошибки по каждому элементу.
+    """
+
+    bulk_lookup_field = 'id'
+    bulk_not_found_message = 'Объект не найден.'
+    bulk_empty_message = 'Ожидается непустой список объектов.'
+
+    def get_serializer(self, *args, **kwargs):
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=['PATCH'], url_path='bulk')
+    def bulk_update(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [self.bulk_empty_message]}
+            )
+        lookup = self.bulk_lookup_field
+        queryset = self.get_queryset()
+        field = queryset.model._meta.get_field(lookup)
+        keys = []
+        for item in items:
+            try:
+                keys.append(field.to_python(item.get(lookup)))
+            except (AttributeError, DjangoValidationError):
+                keys.append(None)
+        instances = {
+            getattr(obj, lookup): obj
+            for obj in queryset.filter(**{
+                f'{lookup}__in': [key for key in keys if key is not None]
+            })
+        }
+        serializers, errors = [], []
+        for key, item in zip(keys, items):
+            instance = instances.get(key)
+            if instance is None:
+                errors.append({lookup: [self.bulk_not_found_message]})
+                continue
+            serializer = self.get_serializer(instance, data=item, partial=True)
+            serializer.is_valid()
+            errors.append(serializer.errors)
+            serializers.append(serializer)
+        if any(errors):
+            raise ValidationError(errors)
+        objects = [serializer.instance for serializer in serializers]
+        self.perform_bulk_update(
+            objects, [serializer.validated_data for serializer in serializers]
+        )
+        return Response(
+            self.get_serializer(objects, many=True).data,
+            status=status.HTTP_200_OK
+        )
+
+    def perform_bulk_update(self, objects, validated_data):
+        self.get_serializer(objects, many=True).update(
+            objects, validated_data
+        )
+
+
+class SparseFieldsMixin:
+    """Параметры ?fields= и ?expand= для GET-запросов.
+
+    fields оставляет в ответе перечисленные поля сериализатора,
+    expand разворачивает связи из его expandable_fields. Вместе с
+    полями сокращается и запрос: apply_sparse_fields оставляет в only()
+    колонки из sparse_columns и expand_columns (по умолчанию колонка
+    с именем поля), required_columns всегда, и убирает select_related
+    и prefetch_related ненужных связей.
+    """
+
+    sparse_columns = {}
+    expand_columns = {}
+    required_columns = ('id',)
+    sparse_prefetch = ()
+    unknown_fields_message = 'Неизвестные поля: {}.'
+
+    def split_param(self, name):
+        return [
+            value.strip()
+            for value in self.request.query_params[name].split(',')
+            if value.strip()
+        ]
+
+    def get_sparse_fields(self):
+        """(fields, expand) из параметров запроса или None без них."""
+        params = self.request.query_params
+        if (
+            self.request.method not in ('GET', 'HEAD')
+            or ('fields' not in params and 'expand' not in params)
+        ):
+            return None
+        serializer_class = self.get_serializer_class()
+        known = serializer_class.Meta.fields
+        fields = (
+            self.split_param('fields') if 'fields' in params else list(known)
+        )
+        expand = (
+            self.split_param('expand') if 'expand' in params
+            else list(serializer_class.default_expand)
+        )
+        errors = {}
+        for name, values, allowed in (
+            ('fields', fields, known),
+            ('expand', expand, serializer_class.expandable_fields),
+        ):
+            unknown = [value for value in values if value not in allowed]
+            if unknown:
+                errors[name] = [
+                    self.unknown_fields_message.format(', '.join(unknown))
+                ]
+        if errors:
+            raise ValidationError(errors)
+        return fields, [name for name in expand if name in fields]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        sparse = self.get_sparse_fields()
+        if sparse is not None:
+            context['fields'], context['expand'] = sparse
+        return context
+
+    def apply_sparse_fields(self, queryset):
+        sparse = self.get_sparse_fields()
+        if sparse is None:
+            return queryset
+        fields, expand = sparse
+        columns = set(self.required_columns)
+        for name in fields:
+            if name in expand:
+                columns.update(self.expand_columns[name])
+            else:
+                columns.update(self.sparse_columns.get(name, (name,)))
+        related = {
+            column.split('__')[0] for column in columns if '__' in column
+        }
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        prefetch = [name for name in self.sparse_prefetch if name in fields]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*columns)
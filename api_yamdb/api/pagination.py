@@ -0,0 +1,183 @@
+import hashlib
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.cache import get_cache, get_versions, table_version_name
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса PostgreSQL или None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cached_count(queryset):
+    """COUNT(*) запроса из кэша.
+
+    Ключ включает текст запроса с параметрами фильтров и версии всех
+    таблиц запроса, поэтому запись в любую из них делает значение
+    устаревшим. Если оценка PostgreSQL больше COUNT_ESTIMATE_THRESHOLD,
+    вместо точного COUNT кэшируется оценка.
+    """
+    query = queryset.query
+    tables = sorted({
+        query.alias_map[alias].table_name for alias in query.alias_map
+    } or {queryset.model._meta.db_table})
+    try:
+        sql, params = query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    versions = get_versions(table_version_name(table) for table in tables)
+    key = f'count:{digest}:' + ':'.join(str(version) for version in versions)
+    cache = get_cache()
+    count = cache.get(key)
+    if count is None:
+        threshold = settings.COUNT_ESTIMATE_THRESHOLD
+        count = estimate_count(queryset) if threshold is not None else None
+        if count is None or count <= threshold:
+            count = queryset.count()
+        cache.set(key, count, timeout=settings.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination с кэшем COUNT и опциональным режимом курсора.
+
+    Если во вьюсете задан keyset_ordering и в запросе есть параметр
+    cursor (пустой для первой страницы), страница выбирается условием
+    WHERE по значениям полей сортировки последней строки, без OFFSET
+    и COUNT. Ответ сохраняет ключи count/next/previous/results,
+    count в этом режиме равен None.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def get_count(self, queryset):
+        """Количество объектов из кэша счётчиков вместо COUNT(*)."""
+        if not hasattr(queryset, 'query'):
+            return len(queryset)
+        return cached_count(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'keyset_ordering', None)
+        self.keyset = (
+            ordering is not None
+            and self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+        values, reverse = self.decode_cursor(
+            request.query_params[self.cursor_query_param], queryset.model
+        )
+        self.has_cursor = values is not None
+        queryset = queryset.order_by(*(
+            f'-{name}' if desc != reverse else name
+            for name, desc in self.ordering
+        ))
+        if self.has_cursor:
+            queryset = queryset.filter(self.position_filter(values, reverse))
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        self.page = page
+        return page
+
+    def position_filter(self, values, reverse):
+        """Строки строго после позиции values в порядке сортировки."""
+        condition = Q()
+        for index, (name, desc) in enumerate(self.ordering):
+            lookup = 'lt' if desc != reverse else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_index, (prev_name, _) in enumerate(
+                self.ordering[:index]
+            ):
+                step &= Q(**{prev_name: values[prev_index]})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, obj, reverse):
+        values = [getattr(obj, name) for name, _ in self.ordering]
+        payload = json.dumps({
+            'v': [
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in values
+            ],
+            'r': reverse
+        })
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            b64encode(payload.encode()).decode()
+        )
+
+    def decode_cursor(self, cursor, model):
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(b64decode(cursor.encode()).decode())
+            if len(payload['v']) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, payload['v'])
+            ]
+            reverse = bool(payload['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
@@ -8,15 +8,34 @@ class AdminPermission(BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
+def can_moderate(user):
+    """Может ли user менять чужие Отзывы и Комментарии."""
+    return user.is_authenticated and (user.is_admin or user.is_moderator)
+
+
 class CommentReviewPermission(BasePermission):
-    """Пермишен для Comment и Review."""
+    """Пермишен для Comment и Review.
+
+    Автор сравнивается по author_id, без загрузки пользователя.
+    """
+
+    @staticmethod
+    def can_edit(user, obj, moderator=None):
+        """Может ли user менять obj.
+
+        Для списка moderator вычисляется один раз и передаётся
+        для каждого объекта.
+        """
+        if moderator is None:
+            moderator = can_moderate(user)
+        return moderator or (
+            user.is_authenticated and obj.author_id == user.id
+        )
 
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user
-            or request.user.is_admin
-            or request.user.is_moderator
+            or self.can_edit(request.user, obj)
         )
 
 
@@ -0,0 +1,223 @@
+"""Профилирование запросов: время, запросы к БД, сериализация, размер.
+
+Статистика копится в памяти процесса в виде гистограмм по методу
+и имени маршрута (GET titles-list, PATCH title_reviews-detail)
+и периодически публикуется в общий кэш, откуда её собирают эндпоинт
+и команда profiling_report. Запись включает api.middleware.ProfilingMiddleware.
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from api.cache import get_cache
+
+BUCKETS = {
+    'wall_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'db_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'serializer_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+    'queries': (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    'response_bytes': (1000, 10000, 100000, 1000000),
+}
+FLAGGED_MAX_LENGTH = 100
+PROCESSES_KEY = 'profiling:processes'
+
+# Измерения текущего запроса или None, если запрос не профилируется.
+current_record = ContextVar('profiling_record', default=None)
+
+
+def empty_histogram(bounds):
+    return {
+        'count': 0,
+        'sum': 0,
+        'max': 0,
+        'buckets': [0] * (len(bounds) + 1)
+    }
+
+
+def observe(histogram, bounds, value):
+    histogram['count'] += 1
+    histogram['sum'] += value
+    histogram['max'] = max(histogram['max'], value)
+    index = next(
+        (index for index, bound in enumerate(bounds) if value <= bound),
+        len(bounds)
+    )
+    histogram['buckets'][index] += 1
+
+
+def merge_histograms(target, source):
+    target['count'] += source['count']
+    target['sum'] += source['sum']
+    target['max'] = max(target['max'], source['max'])
+    target['buckets'] = [
+        left + right
+        for left, right in zip(target['buckets'], source['buckets'])
+    ]
+
+
+class RequestRecord:
+    """Измерения одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper: считает запросы и время."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+class ProfiledSerializerMixin:
+    """Учитывает время to_representation сериализатора в профиле.
+
+    Вложенные сериализаторы не учитываются повторно.
+    """
+
+    def to_representation(self, instance):
+        record = current_record.get()
+        if record is None:
+            return super().to_representation(instance)
+        record.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            record.serializer_depth -= 1
+            if not record.serializer_depth:
+                record.serializer_time += time.perf_counter() - start
+
+
+class ProfileStore:
+    """Гистограммы процесса по маршрутам и превысившие бюджет запросы."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+            self.flagged = deque(maxlen=FLAGGED_MAX_LENGTH)
+            self.published = 0.0
+
+    def add(self, route, path, record, wall_time, size):
+        over_budget = record.queries > settings.PROFILING_QUERY_BUDGET
+        values = {
+            'wall_ms': wall_time * 1000,
+            'db_ms': record.db_time * 1000,
+            'serializer_ms': record.serializer_time * 1000,
+            'queries': record.queries,
+            'response_bytes': size,
+        }
+        with self.lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = {
+                    'requests': 0,
+                    'over_budget': 0,
+                    **{
+                        name: empty_histogram(bounds)
+                        for name, bounds in BUCKETS.items()
+                    }
+                }
+            stats['requests'] += 1
+            stats['over_budget'] += over_budget
+            for name, value in values.items():
+                observe(stats[name], BUCKETS[name], value)
+            if over_budget:
+                self.flagged.append({
+                    'route': route,
+                    'path': path,
+                    'queries': record.queries,
+                    'wall_ms': round(values['wall_ms'], 3),
+                    'time': time.time(),
+                })
+            publish = (
+                time.monotonic() - self.published
+                >= settings.PROFILING_PUBLISH_INTERVAL
+            )
+        if publish:
+            self.publish()
+        return over_budget
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'routes': {
+                    route: {
+                        name: (
+                            {**value, 'buckets': list(value['buckets'])}
+                            if isinstance(value, dict) else value
+                        )
+                        for name, value in stats.items()
+                    }
+                    for route, stats in self.routes.items()
+                },
+                'flagged': list(self.flagged),
+            }
+
+    def process_key(self):
+        return f'profiling:process:{os.getpid()}'
+
+    def publish(self):
+        """Сохраняем снимок процесса в общий кэш."""
+        cache = get_cache()
+        key = self.process_key()
+        cache.set(key, self.snapshot(), timeout=None)
+        processes = cache.get(PROCESSES_KEY) or []
+        if key not in processes:
+            cache.set(PROCESSES_KEY, [*processes, key], timeout=None)
+        with self.lock:
+            self.published = time.monotonic()
+
+
+store = ProfileStore()
+
+
+def collect_report():
+    """Статистика всех процессов, опубликованная в общий кэш.
+
+    Снимок текущего процесса публикуется перед сборкой, чтобы отчёт
+    включал самые свежие данные.
+    """
+    if store.routes:
+        store.publish()
+    cache = get_cache()
+    snapshots = cache.get_many(cache.get(PROCESSES_KEY) or []).values()
+    routes, flagged = {}, []
+    for snapshot in snapshots:
+        flagged.extend(snapshot['flagged'])
+        for route, stats in snapshot['routes'].items():
+            if route not in routes:
+                routes[route] = stats
+                continue
+            target = routes[route]
+            target['requests'] += stats['requests']
+            target['over_budget'] += stats['over_budget']
+            for name in BUCKETS:
+                merge_histograms(target[name], stats[name])
+    flagged.sort(key=lambda item: item['time'])
+    return {
+        'buckets': BUCKETS,
+        'query_budget': settings.PROFILING_QUERY_BUDGET,
+        'routes': routes,
+        'flagged': flagged[-FLAGGED_MAX_LENGTH:],
+    }
+
+
+def reset_report():
+    """Сбрасываем статистику процесса и опубликованные снимки."""
+    cache = get_cache()
+    cache.delete_many([*(cache.get(PROCESSES_KEY) or []), PROCESSES_KEY])
+    store.reset()
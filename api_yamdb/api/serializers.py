@@ -1,9 +1,16 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q, prefetch_related_objects
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from api.cache import (
+    get_catalog,
+    invalidate_catalog,
+    invalidate_object,
+    invalidate_table
+)
 from api.const import (
     CODE_MAX_LENGTH,
     EMAIL_MAX_LENGTH,
@@ -12,35 +19,191 @@ from api.const import (
     USERNAME_MAX_LENGTH,
     CODE_MAX_LENGTH
 )
-from api_yamdb.settings import EMAIL
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.permissions import CommentReviewPermission, can_moderate
+from api.profiling import ProfiledSerializerMixin
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.search import index_documents
+from users.mailing import queue_email
 from users.models import User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """Поле slug Категории или Жанра, которое ищется в кэше каталога."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = get_catalog(self.get_queryset().model).get(data)
+        if obj is None:
+            self.fail(
+                'does_not_exist',
+                slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return obj
+
+
+class SparseFieldsSerializer(serializers.Serializer):
+    """Поля ответа и развёрнутые связи из ?fields= и ?expand=.
+
+    Вьюсет с api.mixins.SparseFieldsMixin кладёт их в context['fields']
+    и context['expand']. Связь из expandable_fields отдаётся вложенным
+    объектом её сериализатора, иначе полем по умолчанию (slug,
+    username). default_expand разворачивается, если ?expand= нет.
+    """
+
+    # Имя поля: (сериализатор, many).
+    expandable_fields = {}
+    default_expand = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+        return {
+            name: field for name, field in fields.items() if name in requested
+        }
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name in self.context.get('expand', self.default_expand):
+            if name not in data:
+                continue
+            serializer_class, many = self.expandable_fields[name]
+            value = getattr(instance, name)
+            data[name] = serializer_class(
+                value.all() if many else value, many=many
+            ).data
+        return data
+
+
+class CatalogListSerializer(serializers.ListSerializer):
+    """Массовое создание и изменение Категорий или Жанров.
+
+    bulk_create и bulk_update не отправляют сигналы, поэтому версии
+    таблицы и каталога сбрасываются здесь.
+    """
+
+    def validate(self, attrs):
+        slugs = [item['slug'] for item in attrs if 'slug' in item]
+        if len(slugs) != len(set(slugs)):
+            raise serializers.ValidationError('Слаги повторяются.')
+        return attrs
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = model.objects.bulk_create(
+            model(**data) for data in validated_data
+        )
+        invalidate_table(model._meta.db_table)
+        invalidate_catalog(model)
+        return objs
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        fields = set()
+        for obj, data in zip(instances, validated_data):
+            for attr, value in data.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+        if fields:
+            model.objects.bulk_update(instances, fields)
+        invalidate_table(model._meta.db_table)
+        invalidate_catalog(model)
+        return instances
+
+
+class CategorySerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор категорий."""
 
     class Meta:
         model = Category
         exclude = ('id',)
+        list_serializer_class = CatalogListSerializer
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Сериализатор жанров."""
 
     class Meta:
         model = Genre
         exclude = ('id',)
+        list_serializer_class = CatalogListSerializer
+
 
+class TitleListSerializer(serializers.ListSerializer):
+    """Массовое создание и изменение произведений.
 
-class TitleSerializer(serializers.ModelSerializer):
+    Слаги Категорий и Жанров уже найдены в кэше каталога, произведения
+    и их Жанры записываются через bulk_create. Сигналы при этом не
+    отправляются, поэтому индекс поиска и версии кэшей обновляются здесь.
+    """
+
+    def create(self, validated_data):
+        genres = [data.pop('genre') for data in validated_data]
+        titles = [Title(**data) for data in validated_data]
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Title.objects.bulk_create(titles)
+                index_documents(titles)
+            else:
+                # Без RETURNING (SQLite) pk известны только после save.
+                # Выделять их заранее по Max(pk) нельзя: параллельная
+                # вставка получила бы тот же pk.
+                for title in titles:
+                    title.save()
+            self.set_genres(titles, genres)
+        invalidate_table(Title._meta.db_table)
+        prefetch_related_objects(titles, 'genre')
+        return titles
+
+    def update(self, instances, validated_data):
+        fields = set()
+        titles_genres = []
+        for title, data in zip(instances, validated_data):
+            if 'genre' in data:
+                titles_genres.append((title, data.pop('genre')))
+            for attr, value in data.items():
+                setattr(title, attr, value)
+                fields.add(attr)
+        with transaction.atomic():
+            if fields:
+                Title.objects.bulk_update(instances, fields)
+            if titles_genres:
+                TitleGenre.objects.filter(
+                    title__in=[title for title, _ in titles_genres]
+                ).delete()
+                self.set_genres(*zip(*titles_genres))
+            index_documents(instances)
+        invalidate_table(Title._meta.db_table)
+        for title in instances:
+            invalidate_object(Title, title.pk)
+            title._prefetched_objects_cache = {}
+        prefetch_related_objects(instances, 'genre')
+        return instances
+
+    def set_genres(self, titles, genres):
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        invalidate_table(TitleGenre._meta.db_table)
+
+
+class TitleSerializer(
+    ProfiledSerializerMixin,
+    SparseFieldsSerializer,
+    serializers.ModelSerializer
+):
     """Cериализатор для произведений."""
 
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True,
@@ -49,6 +212,12 @@ class TitleSerializer(serializers.ModelSerializer):
     )
     rating = serializers.IntegerField(default=0, read_only=True)
 
+    expandable_fields = {
+        'genre': (GenreSerializer, True),
+        'category': (CategorySerializer, False),
+    }
+    default_expand = ('genre', 'category')
+
     class Meta:
         model = Title
         fields = (
@@ -60,19 +229,71 @@ class TitleSerializer(serializers.ModelSerializer):
             'genre',
             'category'
         )
+        list_serializer_class = TitleListSerializer
+
+
+class TitleStatsSerializer(ProfiledSerializerMixin, serializers.Serializer):
+    """Сериализатор статистики оценок произведения.
+
+    Принимает гистограмму {оценка: количество Отзывов}.
+    """
+
+    count = serializers.SerializerMethodField()
+    mean = serializers.SerializerMethodField()
+    histogram = serializers.SerializerMethodField()
 
-    def to_representation(self, value):
-        serializer = super().to_representation(value)
-        serializer['genre'] = GenreSerializer(
-            value.genre.all(), many=True
-        ).data
-        serializer['category'] = CategorySerializer(
-            value.category
-        ).data
-        return serializer
+    def get_count(self, histogram):
+        return sum(histogram.values())
 
+    def get_mean(self, histogram):
+        count = self.get_count(histogram)
+        if not count:
+            return None
+        return sum(
+            score * score_count for score, score_count in histogram.items()
+        ) / count
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def get_histogram(self, histogram):
+        return {str(score): count for score, count in histogram.items()}
+
+
+class CanEditSerializer(serializers.Serializer):
+    """Поле can_edit: может ли текущий пользователь менять объект.
+
+    Роль проверяется один раз на ответ, для каждого объекта
+    сравнивается только author_id.
+    """
+
+    can_edit = serializers.SerializerMethodField()
+
+    def get_can_edit(self, obj):
+        request = self.context.get('request')
+        if request is None:
+            return False
+        moderator = self.context.get('can_moderate')
+        if moderator is None:
+            moderator = self.context['can_moderate'] = can_moderate(
+                request.user
+            )
+        return CommentReviewPermission.can_edit(
+            request.user, obj, moderator
+        )
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Публичные поля автора для ?expand=author."""
+
+    class Meta:
+        model = User
+        fields = ('username', 'first_name', 'last_name', 'bio')
+
+
+class ReviewSerializer(
+    ProfiledSerializerMixin,
+    CanEditSerializer,
+    SparseFieldsSerializer,
+    serializers.ModelSerializer
+):
     """Cериализатор модели Review."""
 
     author = serializers.SlugRelatedField(
@@ -80,25 +301,30 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
     score = serializers.IntegerField()
 
+    expandable_fields = {'author': (AuthorSerializer, False)}
+
     class Meta:
         """Класс Meta Cериализатора модели Review."""
 
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date', 'can_edit')
 
-    def validate(self, data):
-        """Проверка существования Отзыва c title_id и author."""
-        if self.partial:
-            return data
-        title_id = int(self.context['view'].kwargs['title_id'])
-        author = self.context['request'].user
-        titles = Review.objects.values('title').filter(
-            title=title_id, author=author).exists()
-        if titles:
-            raise serializers.ValidationError(
-                'Нельзя делать повторный Отзыв одного и того же произведения'
-            )
-        return data
+    def create(self, validated_data):
+        """Повторный Отзыв отсекает ограничение unique_author_title.
+
+        Отдельная проверка перед INSERT не нужна и не защищает от
+        параллельных запросов.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя делать повторный Отзыв одного и того же '
+                    'произведения'
+                ]
+            })
 
     def validate_score(self, value):
         """Проверка поля score."""
@@ -108,27 +334,41 @@ class ReviewSerializer(serializers.ModelSerializer):
             f'Оценка выходит за диапазон, {MIN_SCORE}..{MAX_SCORE}')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    ProfiledSerializerMixin,
+    CanEditSerializer,
+    SparseFieldsSerializer,
+    serializers.ModelSerializer
+):
     """Cериализатор комментариев."""
 
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
 
+    expandable_fields = {'author': (AuthorSerializer, False)}
+
     class Meta:
         model = Comment
-        fields = ('id', 'text', 'author', 'pub_date')
+        fields = ('id', 'text', 'author', 'pub_date', 'can_edit')
 
     def validate(self, data):
-        """Проверка существования записи с title_id и review_id."""
+        """Проверка существования Отзыва с title_id и review_id.
+
+        Вьюсет запоминает Отзыв, поэтому perform_create не запросит
+        его повторно.
+        """
         if self.partial:
             return data
-        review_id = self.context['view'].kwargs['review_id']
-        get_object_or_404(Review, id=review_id)
+        self.context['view'].get_review()
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    ProfiledSerializerMixin,
+    SparseFieldsSerializer,
+    serializers.ModelSerializer
+):
     """Сериализатор пользователя."""
 
     class Meta:
@@ -143,7 +383,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class SignUpSerializer(serializers.Serializer):
+class SignUpSerializer(ProfiledSerializerMixin, serializers.Serializer):
     """Сериализатор регистрации."""
     username = serializers.RegexField(
         regex=r'^[\w.@+-]+\Z',
@@ -161,26 +401,41 @@ class SignUpSerializer(serializers.Serializer):
         return username
 
     def validate(self, data):
+        """Ищем пользователя по username или email одним запросом.
+
+        Повторная регистрация разрешена только при совпадении обоих полей.
+        """
+        users = User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        ).only(
+            'id', 'username', 'email', 'password', 'last_login'
+        ).order_by()[:2]
+        for user in users:
+            if (user.username, user.email) != (data['username'],
+                                               data['email']):
+                raise serializers.ValidationError(
+                    'Такой username или email уже существует'
+                )
+            data['user'] = user
+        return data
+
+    def create(self, validated_data):
+        user = validated_data.pop('user', None)
         try:
-            User.objects.get_or_create(
-                username=data.get('username'),
-                email=data.get('email')
-            )
+            with transaction.atomic():
+                if user is None:
+                    user = User.objects.create(**validated_data)
+                queue_email(
+                    'Код подтверждения',
+                    'Ваш код: '
+                    f'{default_token_generator.make_token(user)}',
+                    user.email
+                )
         except IntegrityError:
+            # Пользователя успели создать параллельным запросом.
             raise serializers.ValidationError(
                 'Такой username или email уже существует'
             )
-        return data
-
-    def create(self, validated_data):
-        user, _ = User.objects.get_or_create(**validated_data)
-        confirmation_code = default_token_generator.make_token(user)
-        send_mail(
-            'Код подтверждения',
-            f'Ваш код: {confirmation_code}',
-            EMAIL,
-            [validated_data.get('email')],
-        )
         return user
 
 
@@ -0,0 +1,69 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import invalidate_auth_stamp
+from api.cache import (
+    invalidate_catalog,
+    invalidate_object,
+    invalidate_table
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def revoke_user_tokens(sender, instance, **kwargs):
+    """Сбрасываем отпечаток, чтобы токены проверились заново."""
+    invalidate_auth_stamp(instance.pk)
+
+
+def invalidate_table_caches(sender, **kwargs):
+    """Запись в таблицу сбрасывает закэшированные по ней COUNT."""
+    invalidate_table(sender._meta.db_table)
+
+
+# Только таблицы, по которым строятся кэши: обработчик post_delete
+# отключает быстрое удаление модели, а лишние версии бьют по кэшу.
+for model in (Title, Review, Comment, User, Category, Genre):
+    post_save.connect(invalidate_table_caches, sender=model)
+    post_delete.connect(invalidate_table_caches, sender=model)
+m2m_changed.connect(invalidate_table_caches, sender=Title.genre.through)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_catalogs(sender, **kwargs):
+    """Категории и Жанры меняются и из админки, не только через API."""
+    invalidate_catalog(sender)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate_object(Title, instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, reverse, **kwargs):
+    """Смена Жанров меняет представление произведения."""
+    if not reverse:
+        invalidate_object(Title, instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    """Отзыв меняет свой список и рейтинг произведения."""
+    invalidate_object(Review, instance.pk)
+    invalidate_object(Title, instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate_object(Comment, instance.pk)
+    if instance.review_id is not None:
+        invalidate_object(Review, instance.review_id)
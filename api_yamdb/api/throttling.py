@@ -0,0 +1,22 @@
+from collections.abc import Mapping
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenRateThrottle(SimpleRateThrottle):
+    """Ограничение попыток получить токен для пары username и клиента.
+
+    Клиент входит в ключ, чтобы чужие неудачные попытки не блокировали
+    пользователя. Счётчики хранятся в кэше, а не в БД.
+    """
+
+    scope = 'token'
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident(request)
+        username = None
+        if isinstance(request.data, Mapping):
+            username = request.data.get('username')
+        if isinstance(username, str) and username:
+            ident = f'{username}:{ident}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -10,6 +10,7 @@ from api.views import (
     UserViewSet,
     TokenView,
     SignUpView,
+    ProfilingView,
 )
 
 router_v1 = routers.DefaultRouter()
@@ -36,6 +37,7 @@ auth_path = [
 urlpatterns = [
     path('v1/', include([
         path('', include(router_v1.urls)),
-        path('auth/', include(auth_path))
+        path('auth/', include(auth_path)),
+        path('profiling/', ProfilingView.as_view(), name='profiling')
     ]))
 ]
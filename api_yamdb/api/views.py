@@ -1,39 +1,58 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import (
     IsAuthenticated,
     IsAuthenticatedOrReadOnly
 )
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
-from api.filter import TitleFilters
+from api.authentication import RoleAccessToken
+from api.cache import (
+    catalog_name,
+    get_catalog,
+    object_version_names,
+    table_version_names
+)
+from api.filter import FullTextSearchFilter, TitleFilters
+from api.mixins import (
+    BulkMixin,
+    ConditionalGetMixin,
+    ConditionalListMixin,
+    SparseFieldsMixin
+)
+from api.pagination import KeysetPagination
 from api.permissions import (
     AdminPermission,
     CommentReviewPermission,
     IsAdminOrReadOnly
 )
+from api.profiling import collect_report, reset_report
 from api.serializers import (
+    AuthorSerializer,
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
     ReviewSerializer,
     SignUpSerializer,
     TitleSerializer,
+    TitleStatsSerializer,
     TokenSerializer,
     UserSerializer
 )
-from reviews.models import Category, Genre, Review, Title
+from api.throttling import TokenRateThrottle
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import get_score_histogram
 from users.models import User
 
 
 class CreateDeleteListViewSet(
+    BulkMixin,
+    ConditionalListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -44,21 +63,88 @@ class CreateDeleteListViewSet(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    bulk_lookup_field = 'slug'
     permission_classes = (IsAdminOrReadOnly,)
-
-
-class TitleViewSet(viewsets.ModelViewSet):
+    cache_anonymous_responses = True
+
+    def get_version_names(self):
+        return [catalog_name(self.queryset.model)]
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(self.list_catalog, request, *args, **kwargs)
+
+    def list_catalog(self, request, *args, **kwargs):
+        """Список из кэша каталога без запроса к БД."""
+        objects = list(get_catalog(self.queryset.model).values())
+        search_terms = filters.SearchFilter().get_search_terms(request)
+        if search_terms:
+            objects = [
+                obj for obj in objects
+                if all(term.lower() in obj.name.lower()
+                       for term in search_terms)
+            ]
+        page = self.paginate_queryset(objects)
+        if page is None:
+            return Response(self.get_serializer(objects, many=True).data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class TitleViewSet(
+    BulkMixin, SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """ViewSet для произведений."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('-year')
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('-year', 'id')
     serializer_class = TitleSerializer
     http_method_names = ('get', 'post', 'patch', 'delete')
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilters
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-year', 'id')
     permission_classes = (IsAdminOrReadOnly,)
+    cache_anonymous_responses = True
+    # Колонки year и id нужны курсору пагинации.
+    required_columns = ('id', 'year')
+    sparse_columns = {
+        'rating': ('rating_sum', 'rating_count'),
+        'genre': (),
+        'category': ('category__slug',),
+    }
+    expand_columns = {
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+    sparse_prefetch = ('genre',)
+
+    def get_queryset(self):
+        return self.apply_sparse_fields(super().get_queryset())
+
+    def get_version_names(self):
+        if self.action == 'retrieve':
+            return [
+                *object_version_names(Title, self.kwargs['pk']),
+                *table_version_names(Category, Genre)
+            ]
+        return table_version_names(
+            Title, Title.genre.through, Review, Category, Genre
+        )
+
+    @action(detail=True, methods=['GET'])
+    def stats(self, request, pk=None):
+        """Количество, средняя и гистограмма оценок по счётчикам."""
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise NotFound()
+        histogram = get_score_histogram(pk)
+        if not any(histogram.values()):
+            get_object_or_404(Title.objects.only('id'), pk=pk)
+        return Response(
+            TitleStatsSerializer(histogram).data, status=status.HTTP_200_OK
+        )
 
 
 class CategoryViewSet(CreateDeleteListViewSet):
@@ -75,66 +161,152 @@ class GenreViewSet(CreateDeleteListViewSet):
     serializer_class = GenreSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Класс ViewSet модели Review."""
 
     serializer_class = ReviewSerializer
     lookup_url_kwarg = 'review_id'
+    filter_backends = (FullTextSearchFilter,)
+    keyset_ordering = ('-pub_date', 'id')
+    # Из автора нужен только username для сериализатора.
+    only_fields = ('text', 'score', 'pub_date', 'title_id', 'author__username')
+    # Колонки курсора пагинации и родителя, которого ждёт related manager.
+    required_columns = ('id', 'pub_date', 'title')
+    sparse_columns = {
+        'author': ('author__username',),
+        'can_edit': ('author',),
+    }
+    expand_columns = {
+        'author': tuple(
+            f'author__{name}' for name in AuthorSerializer.Meta.fields
+        ),
+    }
     permission_classes = (CommentReviewPermission, IsAuthenticatedOrReadOnly)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    vary_on_user = True
+    _title = None
 
     def get_title(self):
-        """Получаем произведение."""
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+        """Произведение из URL, запрашивается один раз за запрос."""
+        if self._title is None:
+            self._title = get_object_or_404(
+                Title.objects.only('id'), id=self.kwargs['title_id']
+            )
+        return self._title
 
     def get_queryset(self):
-        """Выбираем Отзывы для конкретного Произведения."""
-        title = self.get_title()
-        return title.reviews.all()
+        """Выбираем Отзывы для конкретного Произведения.
+
+        Для одного Отзыва произведение отдельно не запрашивается:
+        Отзыв другого произведения не найдётся по title_id.
+        """
+        if self.detail:
+            queryset = Review.objects.filter(title_id=self.kwargs['title_id'])
+        else:
+            queryset = self.get_title().reviews.order_by(
+                *self.keyset_ordering
+            )
+        return self.apply_sparse_fields(
+            queryset.select_related('author').only(*self.only_fields)
+        )
+
+    def get_version_names(self):
+        """Список зависит от произведения, Отзыв от себя и авторов."""
+        if self.action == 'retrieve':
+            names = object_version_names(Review, self.kwargs['review_id'])
+        else:
+            names = object_version_names(Title, self.kwargs['title_id'])
+        return [*names, *table_version_names(User)]
+
+    def get_search_scope(self):
+        """Ищем только среди Отзывов этого произведения."""
+        return int(self.kwargs['title_id'])
 
     def perform_create(self, serializer):
         """Переопределение метода create."""
         title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author_id=self.request.user.id, title=title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Класс ViewSet модели Comment."""
 
     serializer_class = CommentSerializer
     lookup_url_kwarg = 'comment_id'
+    keyset_ordering = ('-pub_date', 'id')
+    only_fields = ('text', 'pub_date', 'review_id', 'author__username')
+    required_columns = ('id', 'pub_date', 'review')
+    sparse_columns = ReviewViewSet.sparse_columns
+    expand_columns = ReviewViewSet.expand_columns
     permission_classes = (CommentReviewPermission, IsAuthenticatedOrReadOnly)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    vary_on_user = True
+    _review = None
 
     def get_review(self):
-        """Получаем Отзыв конкретного произведения."""
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Review, id=review_id, title=title_id)
+        """Отзыв из URL, запрашивается один раз за запрос.
+
+        Принадлежность Отзыва произведению проверяется тем же запросом.
+        """
+        if self._review is None:
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'title_id'),
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id']
+            )
+        return self._review
 
     def get_queryset(self):
-        """Выбираем Комментарии для конкретного Отзыва."""
-        review = self.get_review()
-        return review.comments.all()
+        """Выбираем Комментарии для конкретного Отзыва.
+
+        Для одного Комментария Отзыв и произведение проверяются
+        в том же запросе через JOIN.
+        """
+        if self.detail:
+            queryset = Comment.objects.filter(
+                review_id=self.kwargs['review_id'],
+                review__title_id=self.kwargs['title_id']
+            )
+        else:
+            queryset = self.get_review().comments.order_by(
+                *self.keyset_ordering
+            )
+        return self.apply_sparse_fields(
+            queryset.select_related('author').only(*self.only_fields)
+        )
+
+    def get_version_names(self):
+        if self.action == 'retrieve':
+            names = object_version_names(Comment, self.kwargs['comment_id'])
+        else:
+            names = object_version_names(Review, self.kwargs['review_id'])
+        return [*names, *table_version_names(User)]
 
     def perform_create(self, serializer):
         """Переопределение метода create."""
         review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author_id=self.request.user.id, review=review)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """Вьюсет пользователя."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (AdminPermission,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'patch', 'delete')
+    required_columns = ('id', 'username')
+
+    def get_queryset(self):
+        return self.apply_sparse_fields(super().get_queryset())
 
     @action(
         detail=False,
@@ -142,33 +314,52 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def me(self, request):
+        # Пользователь из токена не связан с БД, профиль читаем отдельно.
+        user = request.user
+        if not isinstance(user, User):
+            user = get_object_or_404(User, pk=user.id)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=self.request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class TokenView(APIView):
     """Вью токена."""
 
+    throttle_classes = (TokenRateThrottle,)
+
     def post(self, request):
         """POST-запрос на получение токена."""
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
         confirmation_code = serializer.validated_data['confirmation_code']
-        user = get_object_or_404(User, username=username)
+        # Только поля, нужные для проверки кода и выпуска токена.
+        user = get_object_or_404(
+            User.objects.only(
+                'id',
+                'username',
+                'password',
+                'last_login',
+                'email',
+                'role',
+                'is_superuser',
+                'is_active'
+            ),
+            username=username
+        )
         if not default_token_generator.check_token(user, confirmation_code):
             return Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
-        token = AccessToken.for_user(user)
-        return Response({'token': token}, status=status.HTTP_200_OK)
+        token = RoleAccessToken.for_user(user)
+        return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
 class SignUpView(APIView):
@@ -180,3 +371,16 @@ class SignUpView(APIView):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ProfilingView(APIView):
+    """Отчёт профилирования запросов по маршрутам, только для админа."""
+
+    permission_classes = (AdminPermission,)
+
+    def get(self, request):
+        return Response(collect_report(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        reset_report()
+        return Response(status=status.HTTP_204_NO_CONTENT)
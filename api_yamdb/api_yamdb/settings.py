@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -34,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -82,19 +84,78 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'api.authentication.StatelessJWTAuthentication'
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'token': '20/minute',
+    },
+
+}
 
+# Каталоги Категорий и Жанров и версии ресурсов для ETag и счётчиков
+# кэшируются в CATALOG_CACHE_ALIAS.
+# Версии должны быть общими для всех процессов сервера, поэтому кэш
+# по умолчанию файловый; для нескольких машин нужен redis или memcached.
+CACHE_DIR = os.getenv('YAMDB_CACHE_DIR', str(BASE_DIR / 'cache'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        # Ключи содержат имя БД: тесты и бенчмарк не делят версии с ней.
+        'KEY_PREFIX': 'yamdb',
+        'KEY_FUNCTION': 'api.cache.make_key',
+        # По умолчанию 300: отпечатки пользователей и счётчики вытесняли
+        # бы друг друга и версии.
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb-responses',
+    },
 }
 
+CATALOG_CACHE_ALIAS = 'default'
+
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+# Отпечатки пользователей для отзыва JWT. Кэш должен быть общим для
+# процессов сервера, иначе manage.py check вернёт ошибку api.E001.
+# Срок ограничивает задержку отзыва, если удаление ключа потерялось.
+AUTH_STAMP_CACHE_ALIAS = 'default'
+
+AUTH_STAMP_CACHE_TIMEOUT = 5 * 60
+
+# Счётчики для пагинации: срок жизни в кэше и порог, после которого
+# на PostgreSQL используется оценка планировщика вместо COUNT(*).
+COUNT_CACHE_TIMEOUT = 5 * 60
+
+COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Готовые ответы анонимным пользователям на списки произведений,
+# Жанров и Категорий. Устаревают вместе с версиями ресурсов.
+RESPONSE_CACHE_ALIAS = 'responses'
+
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+
+# Профилирование запросов api.middleware.ProfilingMiddleware: включается
+# переменной окружения, отчёт в /api/v1/profiling/ и profiling_report.
+# Процессы публикуют статистику в CATALOG_CACHE_ALIAS не чаще, чем раз
+# в PROFILING_PUBLISH_INTERVAL секунд.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '') == '1'
+
+PROFILING_QUERY_BUDGET = 20
+
+PROFILING_PUBLISH_INTERVAL = 5
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=15),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -104,6 +165,10 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL = 'uu@yamdb.com'
 
+# Письма ставятся в очередь OutgoingEmail и отправляются командой
+# send_emails. При True письмо отправляется сразу после коммита запроса.
+EMAIL_OUTBOX_EAGER = False
+
 AUTH_USER_MODEL = 'users.User'
 
 LANGUAGE_CODE = 'ru-RU'
@@ -0,0 +1,269 @@
+"""Потоковая пакетная загрузка csv файлов в модели."""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+
+from api.authentication import invalidate_auth_stamps
+from api.cache import invalidate_catalog, invalidate_objects
+from reviews.models import Category, Genre
+from users.models import User
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Файлы набора данных static/data и модели, в которые они загружаются.
+DATASET_FILES = {
+    'users.csv': 'users.User',
+    'category.csv': 'reviews.Category',
+    'genre.csv': 'reviews.Genre',
+    'titles.csv': 'reviews.Title',
+    'genre_title.csv': 'reviews.TitleGenre',
+    'review.csv': 'reviews.Review',
+    'comments.csv': 'reviews.Comment',
+}
+
+
+def get_converters(model, header):
+    """Для каждой колонки csv находим attname поля и функцию приведения."""
+    converters = []
+    for column in header:
+        field = model._meta.get_field(column)
+        target = field.target_field if field.is_relation else field
+        converters.append((field.attname, field.null, target.to_python))
+    return converters
+
+
+def read_rows(csv_file, model):
+    """Генератор словарей attname -> значение, приведённое к типу поля."""
+    reader = csv.reader(csv_file, delimiter=',')
+    converters = get_converters(model, next(reader))
+    for row in reader:
+        yield {
+            attname: None if value == '' and null else to_python(value)
+            for (attname, null, to_python), value in zip(converters, row)
+        }
+
+
+@contextmanager
+def keep_csv_dates(model, attnames):
+    """Не даём auto_now_add затереть даты из csv на время загрузки.
+
+    bulk_create вызывает pre_save полей, и auto_now_add подставляет
+    текущее время вместо значения колонки.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in attnames
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_size))
+
+
+def supports_upsert():
+    """Умеет ли Django и БД делать INSERT ... ON CONFLICT DO UPDATE."""
+    return getattr(
+        connection.features, 'supports_update_conflicts_with_target', False
+    )
+
+
+def write_batch(model, objects, update_fields=None):
+    """Вставляем пакет, обновляя уже существующие по первичному ключу.
+
+    update_fields=None означает, что в csv нет первичного ключа и все
+    строки новые.
+    """
+    if update_fields is None:
+        model.objects.bulk_create(objects)
+        return
+    if not update_fields:
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+        return
+    pk_name = model._meta.pk.attname
+    if supports_upsert():
+        model.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=[pk_name],
+            update_fields=update_fields
+        )
+        return
+    existing = set(model.objects.filter(
+        pk__in=[obj.pk for obj in objects]
+    ).values_list('pk', flat=True))
+    model.objects.bulk_create(
+        [obj for obj in objects if obj.pk not in existing]
+    )
+    model.objects.bulk_update(
+        [obj for obj in objects if obj.pk in existing], update_fields
+    )
+
+
+def reset_sequences(model):
+    """После вставки явных id сдвигаем счётчик первичного ключа."""
+    sql_list = connection.ops.sequence_reset_sql(no_style(), [model])
+    with connection.cursor() as cursor:
+        for sql in sql_list:
+            cursor.execute(sql)
+
+
+def invalidate_loaded(model):
+    """Сбрасываем кэши после загрузки: bulk_create не отправляет сигналы.
+
+    Меняются и объекты, на которые ссылаются загруженные строки:
+    Жанры произведения, Отзывы с новыми Комментариями.
+    """
+    related = {
+        field.related_model for field in model._meta.concrete_fields
+        if field.is_relation
+    }
+    for changed in {model, *related}:
+        invalidate_objects(changed)
+    if model in (Category, Genre):
+        invalidate_catalog(model)
+    if model is User:
+        invalidate_auth_stamps(User.objects.values_list('pk', flat=True))
+
+
+def load_csv(model, file_path, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Загружаем csv файл в модель пакетами внутри одной транзакции.
+
+    Строки с существующим первичным ключом обновляются, остальные
+    вставляются. progress(loaded, rate) вызывается после каждого пакета.
+    Кэши модели сбрасываются после коммита. Возвращает число загруженных строк.
+    """
+    pk_name = model._meta.pk.attname
+    loaded = 0
+    started = time.monotonic()
+    with open(file_path, 'r', encoding='utf-8', newline='') as csv_file:
+        attnames = [
+            attname for attname, _, _ in get_converters(
+                model, next(csv.reader(csv_file))
+            )
+        ]
+        csv_file.seek(0)
+        with transaction.atomic(), keep_csv_dates(model, attnames):
+            for batch in batches(read_rows(csv_file, model), batch_size):
+                update_fields = None
+                if pk_name in batch[0]:
+                    update_fields = [
+                        attname for attname in batch[0] if attname != pk_name
+                    ]
+                write_batch(
+                    model, [model(**row) for row in batch], update_fields
+                )
+                loaded += len(batch)
+                if progress is not None:
+                    elapsed = time.monotonic() - started
+                    progress(loaded, loaded / elapsed if elapsed else 0)
+            reset_sequences(model)
+            invalidate_loaded(model)
+    return loaded
+
+
+def import_levels(labels):
+    """Разбиваем модели на уровни так, чтобы ForeignKey вели на уровни выше.
+
+    Модели одного уровня друг от друга не зависят и могут загружаться
+    параллельно.
+    """
+    models = {label: apps.get_model(label) for label in labels}
+    dependencies = {
+        label: {
+            field.related_model._meta.label
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model is not model
+            and field.related_model._meta.label in models
+        }
+        for label, model in models.items()
+    }
+    levels = []
+    done = set()
+    while len(done) < len(models):
+        level = sorted(
+            label for label, depends in dependencies.items()
+            if label not in done and depends <= done
+        )
+        if not level:
+            raise ValueError('Циклическая зависимость между моделями')
+        levels.append(level)
+        done.update(level)
+    return levels
+
+
+def load_file(label, file_path, batch_size=DEFAULT_BATCH_SIZE):
+    """Загрузка одного файла набора с отключенной проверкой ForeignKey.
+
+    Вызывается и в рабочих процессах, поэтому принимает имя модели.
+    """
+    with connection.constraint_checks_disabled():
+        return label, load_csv(apps.get_model(label), file_path, batch_size)
+
+
+def load_dataset(directory, batch_size=DEFAULT_BATCH_SIZE, workers=None,
+                 progress=None):
+    """Загружаем все файлы DATASET_FILES из directory в порядке ForeignKey.
+
+    Независимые модели загружаются параллельно в workers процессах
+    (SQLite не допускает параллельной записи, для неё workers=1).
+    Ссылочная целостность проверяется один раз в конце.
+    progress(label, loaded, rate) вызывается после загрузки каждого файла.
+    Возвращает список имён загруженных моделей. Если папки нет или в ней
+    нет ни одного файла набора, выбрасывается FileNotFoundError.
+    """
+    paths = {
+        label: os.path.join(directory, file_name)
+        for file_name, label in DATASET_FILES.items()
+        if os.path.exists(os.path.join(directory, file_name))
+    }
+    if not paths:
+        raise FileNotFoundError(
+            f'В папке {directory} нет файлов набора данных'
+        )
+    if connection.vendor == 'sqlite':
+        workers = 1
+    if workers is None:
+        workers = os.cpu_count()
+    for level in import_levels(paths):
+        started = time.monotonic()
+        if workers == 1 or len(level) == 1:
+            results = [
+                load_file(label, paths[label], batch_size) for label in level
+            ]
+        else:
+            # Рабочие процессы открывают собственные соединения с БД.
+            connections.close_all()
+            with ProcessPoolExecutor(min(workers, len(level))) as executor:
+                results = list(executor.map(
+                    load_file,
+                    level,
+                    [paths[label] for label in level],
+                    [batch_size] * len(level)
+                ))
+        if progress is not None:
+            elapsed = time.monotonic() - started
+            for label, loaded in results:
+                progress(label, loaded, loaded / elapsed if elapsed else 0)
+    connection.check_constraints(table_names=[
+        apps.get_model(label)._meta.db_table for label in paths
+    ])
+    return list(paths)
@@ -0,0 +1,457 @@
+"""Генерация больших наборов данных для бенчмарков и нагрузочных тестов.
+
+Объекты создаются пакетами через bulk_create. Сигналы при этом не
+отправляются, поэтому рейтинги и поисковый индекс пересчитываются
+после вставки целиком.
+
+generate_dataset распределяет Отзывы и авторов по закону Ципфа.
+"""
+import csv
+import os
+import random
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import accumulate, chain
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api.const import MAX_SCORE, MIN_SCORE
+from reviews.csv_import import (
+    DATASET_FILES,
+    DEFAULT_BATCH_SIZE,
+    batches,
+    invalidate_loaded,
+    keep_csv_dates,
+    reset_sequences
+)
+from reviews.models import Review, Title
+from reviews.ratings import recalculate_ratings
+from reviews.search import rebuild_index
+from users.models import User
+
+WORDS = (
+    'тень', 'город', 'море', 'ветер', 'звезда', 'дорога', 'время', 'огонь',
+    'сад', 'мастер', 'ночь', 'песня', 'остров', 'зима', 'война', 'мир',
+    'свет', 'река', 'книга', 'сон', 'лес', 'дом', 'небо', 'память',
+)
+MIN_YEAR = 1900
+MAX_YEAR = 2024
+# Отзывы пишутся за последние REVIEW_PERIOD_DAYS дней, Комментарий
+# в среднем через COMMENT_DELAY_DAYS дней после Отзыва.
+REVIEW_PERIOD_DAYS = 5 * 365
+COMMENT_DELAY_DAYS = 3
+
+
+def sentence(rng, length):
+    return ' '.join(rng.choices(WORDS, k=length)).capitalize()
+
+
+def review_date(rng, now):
+    """Дата Отзыва: активность растёт, свежих Отзывов больше."""
+    return now - timedelta(days=REVIEW_PERIOD_DAYS * rng.random() ** 2)
+
+
+def comment_date(rng, review_pub_date, now):
+    """Дата Комментария через случайную паузу после Отзыва."""
+    delay = timedelta(days=rng.expovariate(1 / COMMENT_DELAY_DAYS))
+    return min(review_pub_date + delay, now)
+
+
+# Вероятности одного, двух, трёх и четырёх Жанров у произведения.
+GENRES_PER_TITLE_WEIGHTS = (0.5, 0.3, 0.15, 0.05)
+DEFAULT_TITLE_EXPONENT = 1.1
+DEFAULT_USER_EXPONENT = 1.0
+GENERATED_LABELS = (
+    'users.User', 'reviews.Category', 'reviews.Genre', 'reviews.Title',
+    'reviews.TitleGenre', 'reviews.Review', 'reviews.Comment'
+)
+MODEL_FILES = {label: file_name for file_name, label in DATASET_FILES.items()}
+BASE_SHARD = 'base'
+
+
+def zipf_cum_weights(size, exponent):
+    """Накопленные веса рангов 1..size по закону Ципфа."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+def weighted_choice(rng, cum_weights):
+    """Индекс по накопленным весам, быстрее rng.choices для одного."""
+    return bisect_left(cum_weights, rng.random() * cum_weights[-1])
+
+
+def weighted_sample(rng, cum_weights, count):
+    """count разных индексов с учётом весов.
+
+    Когда выборка близка к размеру популяции, отбрасывание повторов
+    сходится медленно, и остаток добирается равномерно.
+    """
+    size = len(cum_weights)
+    if count * 2 > size:
+        return rng.sample(range(size), count)
+    chosen = set()
+    for _ in range(count * 4):
+        chosen.add(weighted_choice(rng, cum_weights))
+        if len(chosen) == count:
+            return list(chosen)
+    rest = [index for index in range(size) if index not in chosen]
+    return [*chosen, *rng.sample(rest, count - len(chosen))]
+
+
+def zipf_counts(total, size, exponent, cap, rng):
+    """Раскладываем total по size корзинам по закону Ципфа.
+
+    В корзине не больше cap. Корзины перемешиваются, чтобы
+    популярность не зависела от порядка pk.
+    """
+    if total > size * cap:
+        raise ValueError('Количество больше, чем вмещают корзины.')
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    counts = [0] * size
+    remaining = total
+    available = list(range(size))
+    while remaining:
+        weight_sum = sum(weights[index] for index in available)
+        allocated = 0
+        for index in available:
+            share = min(
+                cap - counts[index],
+                int(remaining * weights[index] / weight_sum)
+            )
+            counts[index] += share
+            allocated += share
+        if not allocated:
+            # Остаток меньше числа корзин: по одному самым популярным.
+            for index in available[:remaining]:
+                counts[index] += 1
+                allocated += 1
+        remaining -= allocated
+        available = [index for index in available if counts[index] < cap]
+    rng.shuffle(counts)
+    return counts
+
+
+class DatabaseWriter:
+    """Пишет строки шарда в БД пакетами bulk_create."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+
+    def write(self, label, rows):
+        model = apps.get_model(label)
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        written = 0
+        # Иначе auto_now_add заменит сгенерированные pub_date.
+        with keep_csv_dates(model, list(first)):
+            for batch in batches(chain([first], rows), self.batch_size):
+                model.objects.bulk_create(model(**row) for row in batch)
+                written += len(batch)
+        return written
+
+
+class CsvWriter:
+    """Пишет строки шарда в файлы набора данных каталога шарда.
+
+    Файл без строк не создаётся: loadcsv ждёт заголовок в каждом файле.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, label, rows):
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        path = os.path.join(self.directory, MODEL_FILES[label])
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(first))
+            writer.writeheader()
+            writer.writerow(first)
+            written = 1
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        return written
+
+
+def get_writer(directory, shard_name, batch_size):
+    if directory is None:
+        return DatabaseWriter(batch_size)
+    return CsvWriter(os.path.join(directory, shard_name))
+
+
+def next_pks():
+    """Первый свободный pk каждой модели набора."""
+    return {
+        label: (apps.get_model(label).objects.aggregate(
+            max_pk=Max('pk')
+        )['max_pk'] or 0) + 1
+        for label in GENERATED_LABELS
+    }
+
+
+def make_plan(titles, reviews, users, comments, genres, categories, seed,
+              title_exponent, user_exponent, shards, pks):
+    """Раскладываем Отзывы по произведениям, а объекты по шардам.
+
+    Каждому шарду заранее выделяются диапазоны pk, поэтому шарды
+    генерируются независимо друг от друга.
+    """
+    rng = random.Random(seed)
+    review_counts = zipf_counts(reviews, titles, title_exponent, users, rng)
+    plan = {
+        'seed': seed,
+        'users': users,
+        'genres': genres,
+        'categories': categories,
+        'title_exponent': title_exponent,
+        'user_exponent': user_exponent,
+        'pks': pks,
+        'now': timezone.now().replace(microsecond=0),
+        'shards': [],
+    }
+    shard_size = max(1, -(-titles // shards))
+    review_pk = pks['reviews.Review']
+    comment_pk = pks['reviews.Comment']
+    for index, start in enumerate(range(0, titles, shard_size)):
+        shard_reviews = review_counts[start:start + shard_size]
+        review_total = sum(shard_reviews)
+        shard_comments = comments * review_total // reviews if reviews else 0
+        plan['shards'].append({
+            'name': f'{index:04d}',
+            'title_start': pks['reviews.Title'] + start,
+            'title_genre_start': (
+                pks['reviews.TitleGenre']
+                + start * len(GENRES_PER_TITLE_WEIGHTS)
+            ),
+            'review_start': review_pk,
+            'reviews': shard_reviews,
+            'comment_start': comment_pk,
+            'comments': shard_comments,
+        })
+        review_pk += review_total
+        comment_pk += shard_comments
+    # Остаток от округления достаётся шарду, где больше всего Отзывов.
+    rest = comments - (comment_pk - pks['reviews.Comment'])
+    if reviews and rest:
+        busiest = max(plan['shards'], key=lambda shard: sum(shard['reviews']))
+        busiest['comments'] += rest
+        for shard in plan['shards']:
+            if shard['comment_start'] > busiest['comment_start']:
+                shard['comment_start'] += rest
+    return plan
+
+
+def generate_base(plan, directory, batch_size):
+    """Пользователи, Категории и Жанры, общие для всех шардов."""
+    rng = random.Random(f'{plan["seed"]}:{BASE_SHARD}')
+    writer = get_writer(directory, BASE_SHARD, batch_size)
+    password = make_password(None)
+    pks = plan['pks']
+    counts = {}
+    counts['users.User'] = writer.write('users.User', (
+        {
+            'id': pk,
+            'username': f'gen{pk}',
+            'email': f'gen{pk}@yamdb.fake',
+            'password': password,
+            'role': User.USER,
+            'bio': sentence(rng, 5),
+        }
+        for pk in range(pks['users.User'], pks['users.User'] + plan['users'])
+    ))
+    for label, amount, name, slug in (
+        ('reviews.Category', plan['categories'], 'Категория', 'gen-category'),
+        ('reviews.Genre', plan['genres'], 'Жанр', 'gen-genre'),
+    ):
+        counts[label] = writer.write(label, (
+            {'id': pk, 'name': f'{name} {pk}', 'slug': f'{slug}-{pk}'}
+            for pk in range(pks[label], pks[label] + amount)
+        ))
+    return counts
+
+
+def generate_shard(plan, shard, directory, batch_size):
+    """Произведения шарда с их Жанрами, Отзывами и Комментариями.
+
+    Вызывается в рабочих процессах, поэтому всё нужное берёт из plan.
+    Активность пользователей, популярность Жанров, Категорий и
+    Отзывов (по Комментариям) подчиняется закону Ципфа.
+    """
+    rng = random.Random(f'{plan["seed"]}:{shard["name"]}')
+    writer = get_writer(directory, shard['name'], batch_size)
+    pks = plan['pks']
+    user_weights = zipf_cum_weights(plan['users'], plan['user_exponent'])
+    genre_weights = zipf_cum_weights(plan['genres'], plan['title_exponent'])
+    category_weights = zipf_cum_weights(
+        plan['categories'], plan['title_exponent']
+    )
+    genre_amounts = range(1, len(GENRES_PER_TITLE_WEIGHTS) + 1)
+    title_pks = range(
+        shard['title_start'], shard['title_start'] + len(shard['reviews'])
+    )
+    counts = {}
+    counts['reviews.Title'] = writer.write('reviews.Title', (
+        {
+            'id': title_pk,
+            'name': sentence(rng, rng.randint(1, 3)),
+            'year': rng.randint(MIN_YEAR, MAX_YEAR),
+            'description': sentence(rng, 12),
+            'category_id': (
+                pks['reviews.Category']
+                + weighted_choice(rng, category_weights)
+                if category_weights else None
+            ),
+        }
+        for title_pk in title_pks
+    ))
+
+    def title_genres():
+        pk = shard['title_genre_start']
+        for title_pk in title_pks:
+            amount = rng.choices(
+                genre_amounts, weights=GENRES_PER_TITLE_WEIGHTS
+            )[0]
+            for genre in weighted_sample(
+                rng, genre_weights, min(amount, plan['genres'])
+            ):
+                yield {
+                    'id': pk,
+                    'title_id': title_pk,
+                    'genre_id': pks['reviews.Genre'] + genre,
+                }
+                pk += 1
+
+    counts['reviews.TitleGenre'] = writer.write(
+        'reviews.TitleGenre', title_genres()
+    )
+
+    review_dates = []
+
+    def reviews():
+        pk = shard['review_start']
+        for title_pk, amount in zip(title_pks, shard['reviews']):
+            for user in weighted_sample(rng, user_weights, amount):
+                review_dates.append(review_date(rng, plan['now']))
+                yield {
+                    'id': pk,
+                    'title_id': title_pk,
+                    'text': sentence(rng, 20),
+                    'author_id': pks['users.User'] + user,
+                    'score': rng.randint(MIN_SCORE, MAX_SCORE),
+                    'pub_date': review_dates[-1],
+                }
+                pk += 1
+
+    counts['reviews.Review'] = writer.write('reviews.Review', reviews())
+
+    def comments():
+        if not counts['reviews.Review']:
+            return
+        review_weights = zipf_cum_weights(
+            counts['reviews.Review'], plan['title_exponent']
+        )
+        for index in range(shard['comments']):
+            review = weighted_choice(rng, review_weights)
+            yield {
+                'id': shard['comment_start'] + index,
+                'review_id': shard['review_start'] + review,
+                'text': sentence(rng, 10),
+                'author_id': (
+                    pks['users.User'] + weighted_choice(rng, user_weights)
+                ),
+                'pub_date': comment_date(
+                    rng, review_dates[review], plan['now']
+                ),
+            }
+
+    counts['reviews.Comment'] = writer.write('reviews.Comment', comments())
+    return counts
+
+
+def run_shard(plan, shard, directory, batch_size):
+    """Шард в одной транзакции; точка входа рабочего процесса."""
+    with transaction.atomic():
+        return generate_shard(plan, shard, directory, batch_size)
+
+
+def run_shards(plan, directory, batch_size, workers):
+    """Количества объектов каждого шарда по мере генерации."""
+    arguments = [
+        (plan, shard, directory, batch_size) for shard in plan['shards']
+    ]
+    if workers == 1 or len(arguments) < 2:
+        for args in arguments:
+            yield run_shard(*args)
+        return
+    # Рабочие процессы открывают собственные соединения с БД.
+    connections.close_all()
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(run_shard, *zip(*arguments))
+
+
+def update_derived(batch_size):
+    """Счётчики pk, кэши, рейтинги и поисковый индекс после вставки."""
+    for label in GENERATED_LABELS:
+        reset_sequences(apps.get_model(label))
+        invalidate_loaded(apps.get_model(label))
+    recalculate_ratings()
+    rebuild_index(Title, batch_size)
+    rebuild_index(Review, batch_size)
+
+
+def generate_dataset(titles=1000, reviews=20000, users=500, comments=None,
+                     genres=20, categories=10, seed=0,
+                     title_exponent=DEFAULT_TITLE_EXPONENT,
+                     user_exponent=DEFAULT_USER_EXPONENT, workers=1,
+                     shards=None, directory=None,
+                     batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Генерируем набор данных в БД или в csv файлы каталога directory.
+
+    Отзывы распределяются по произведениям по закону Ципфа с
+    показателем title_exponent, авторы выбираются с показателем
+    user_exponent. Произведения делятся на shards шардов, которые
+    генерируются в workers процессах (в БД SQLite: workers=1).
+    pk продолжают pk текущей БД.
+
+    В csv режиме создаётся каталог base с пользователями, Категориями
+    и Жанрами и по каталогу на шард, каждый загружается командой
+    loadcsv --all, начиная с base. В режиме БД затем пересчитываются
+    рейтинги и поисковый индекс. progress(label, count) вызывается
+    после каждого шарда. Возвращает количество объектов по моделям.
+    """
+    if reviews > titles * users:
+        raise ValueError('Отзывов больше, чем пар произведение-автор.')
+    if comments is None:
+        comments = reviews // 2
+    if directory is None and connection.vendor == 'sqlite':
+        workers = 1
+    plan = make_plan(
+        titles, reviews, users, comments, genres, categories, seed,
+        title_exponent, user_exponent, shards or workers * 4, next_pks()
+    )
+    counts = dict.fromkeys(GENERATED_LABELS, 0)
+    with transaction.atomic():
+        counts.update(generate_base(plan, directory, batch_size))
+    if progress:
+        for label in ('users.User', 'reviews.Category', 'reviews.Genre'):
+            progress(label, counts[label])
+    for shard_counts in run_shards(plan, directory, batch_size, workers):
+        for label, count in shard_counts.items():
+            counts[label] += count
+            if progress:
+                progress(label, counts[label])
+    if directory is None:
+        update_derived(batch_size)
+    return counts
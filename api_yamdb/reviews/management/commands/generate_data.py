@@ -0,0 +1,112 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_import import DEFAULT_BATCH_SIZE
+from reviews.datagen import (
+    BASE_SHARD,
+    DEFAULT_TITLE_EXPONENT,
+    DEFAULT_USER_EXPONENT,
+    generate_dataset
+)
+
+
+class Command(BaseCommand):
+    help = ('Генерирует набор данных с реалистичными распределениями.\n'
+            'Пример команды: python manage.py generate_data --titles 1000000 '
+            '--reviews 20000000 --users 200000 --workers 8\n'
+            'В csv файлы для loadcsv: python manage.py generate_data '
+            '--csv data/generated')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=None,
+            help='По умолчанию вдвое меньше Отзывов'
+        )
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=DEFAULT_TITLE_EXPONENT,
+            help='Показатель Ципфа для числа Отзывов на произведение'
+        )
+        parser.add_argument(
+            '--user-zipf',
+            type=float,
+            default=DEFAULT_USER_EXPONENT,
+            help='Показатель Ципфа для активности пользователей'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов генерации'
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=None,
+            help='На сколько частей делить произведения, '
+                 'по умолчанию четыре на процесс'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT'
+        )
+        parser.add_argument(
+            '--csv',
+            default=None,
+            metavar='DIR',
+            help='Записать csv файлы в папку DIR вместо БД'
+        )
+
+    def progress(self, label, count):
+        self.stdout.write(f'{label}: создано {count}')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers должен быть больше нуля')
+        start = time.perf_counter()
+        try:
+            counts = generate_dataset(
+                titles=options['titles'],
+                reviews=options['reviews'],
+                users=options['users'],
+                comments=options['comments'],
+                genres=options['genres'],
+                categories=options['categories'],
+                seed=options['seed'],
+                title_exponent=options['zipf'],
+                user_exponent=options['user_zipf'],
+                workers=options['workers'],
+                shards=options['shards'],
+                directory=options['csv'],
+                batch_size=options['batch_size'],
+                progress=self.progress
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        self.stdout.write(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с)'
+        )
+        if options['csv']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Набор данных записан в {options["csv"]}. Загрузите '
+                f'папку {BASE_SHARD}, затем остальные: python manage.py '
+                f'loadcsv --all {os.path.join(options["csv"], BASE_SHARD)}'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS('Набор данных создан в БД'))
@@ -1,35 +1,97 @@
-import csv
-
 from django.apps import apps
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_import import DEFAULT_BATCH_SIZE, load_csv, load_dataset
+from reviews.models import Review, Title
+from reviews.ratings import recalculate_ratings
+from reviews.search import rebuild_index
+
+# Производные данные, которые bulk_create не обновляет через сигналы.
+DERIVED_UPDATES = {
+    'reviews.Title': (lambda: rebuild_index(Title),),
+    'reviews.Review': (recalculate_ratings, lambda: rebuild_index(Review)),
+}
 
 
 class Command(BaseCommand):
     help = ('Загружает данные из csv файлов в sqlite.\n'
             'Пример команды: '
-            'python manage.py loadcsv static/data/titles.csv reviews Title')
+            'python manage.py loadcsv static/data/titles.csv reviews Title\n'
+            'Весь набор данных: python manage.py loadcsv --all static/data')
 
     def add_arguments(self, parser):
-        parser.add_argument('path', type=str, help='Путь к файлу')
+        parser.add_argument(
+            'path',
+            type=str,
+            help='Путь к файлу или к папке с набором данных для --all'
+        )
         parser.add_argument(
             'app_name',
             type=str,
+            nargs='?',
             help='Имя приложения, к которому подключена модель'
         )
-        parser.add_argument('model_name', type=str, help='Имя модели')
+        parser.add_argument(
+            'model_name', type=str, nargs='?', help='Имя модели'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Загрузить все csv файлы папки path в порядке зависимостей'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов для параллельной загрузки с --all'
+        )
+
+    def progress(self, loaded, rate):
+        self.stdout.write(f'Загружено строк: {loaded} ({rate:.0f} строк/с)')
+
+    def dataset_progress(self, label, loaded, rate):
+        self.stdout.write(
+            f'{label}: загружено строк: {loaded} ({rate:.0f} строк/с)'
+        )
+
+    def update_derived(self, labels):
+        for label in labels:
+            for update in DERIVED_UPDATES.get(label, ()):
+                update()
 
     def handle(self, *args, **options):
+        if options['all']:
+            try:
+                labels = load_dataset(
+                    options['path'],
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    progress=self.dataset_progress
+                )
+            except FileNotFoundError as error:
+                raise CommandError(error)
+            self.update_derived(labels)
+            self.stdout.write(self.style.SUCCESS('Набор данных загружен в БД'))
+            return
+        if not options['app_name'] or not options['model_name']:
+            raise CommandError('Укажите app_name и model_name или --all')
         try:
-            file_path = options['path']
             _model = apps.get_model(options['app_name'], options['model_name'])
-            with open(file_path, 'r') as csv_file:
-                reader = csv.reader(csv_file, delimiter=',')
-                header = next(reader)
-                for row in reader:
-                    _object_dict = {
-                        key: value for key, value in zip(header, row)
-                    }
-                    _model.objects.update_or_create(**_object_dict)
+            load_csv(
+                _model,
+                options['path'],
+                batch_size=options['batch_size'],
+                progress=self.progress
+            )
+            self.update_derived([_model._meta.label])
             self.stdout.write(self.style.SUCCESS('Файл загружен в БД'))
         except LookupError:
+            self.stdout.write(self.style.ERROR('Ошибка, не найдена модель'))
+        except FileNotFoundError:
             self.stdout.write(self.style.ERROR('Ошибка, не найден файл'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import DOCUMENTS, rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Заново строит поисковый индекс произведений и Отзывов.\n'
+            'Пример команды: python manage.py rebuild_search_index')
+
+    def handle(self, *args, **options):
+        for model in DOCUMENTS:
+            rebuild_index(model)
+            self.stdout.write(self.style.SUCCESS(
+                f'Проиндексировано: {model._meta.verbose_name_plural}'
+            ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сохранённые рейтинги произведений по Отзывам.\n'
+            'Пример команды: python manage.py recalculate_ratings')
+
+    def handle(self, *args, **options):
+        updated = recalculate_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны рейтинги произведений: {updated}')
+        )
@@ -0,0 +1,73 @@
+# Generated by Django 3.2 on 2026-10-18 12:00
+
+from django.db import migrations
+
+SEARCH_TABLE = 'reviews_search'
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_search_index(apps, schema_editor):
+    """Таблица поискового индекса и индексация существующих записей.
+
+    Коды типов документов совпадают с reviews.search.DOCUMENTS:
+    0 - произведение, 1 - Отзыв. Для других СУБД таблица не создаётся,
+    и поиск работает по индексу в памяти.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite' and has_fts5(schema_editor.connection):
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {SEARCH_TABLE} '
+            'USING fts5(body, scope UNINDEXED)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, body, scope) '
+            "SELECT id * 2, name || ' ' || COALESCE(description, ''), NULL "
+            'FROM reviews_title'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, body, scope) '
+            'SELECT id * 2 + 1, text, title_id FROM reviews_review'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {SEARCH_TABLE} ('
+            'doc_type smallint NOT NULL, '
+            'doc_id bigint NOT NULL, '
+            'scope bigint NULL, '
+            'body tsvector NOT NULL, '
+            'PRIMARY KEY (doc_type, doc_id))'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {SEARCH_TABLE}_body_idx '
+            f'ON {SEARCH_TABLE} USING gin (body)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (doc_type, doc_id, scope, body) '
+            "SELECT 0, id, NULL, to_tsvector('russian', "
+            "name || ' ' || COALESCE(description, '')) FROM reviews_title"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (doc_type, doc_id, scope, body) '
+            "SELECT 1, id, title_id, to_tsvector('russian', text) "
+            'FROM reviews_review'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from api.const import (
     MAX_SCORE,
@@ -76,6 +76,9 @@ class Genre(BaseCategoryGenreModel):
         verbose_name_plural = 'Жанры'
 
 
+RATING_FIELDS = ('rating_sum', 'rating_count')
+
+
 class Title(models.Model):
     """Модель произведений."""
 
@@ -103,16 +106,57 @@ class Title(models.Model):
         null=True,
         verbose_name='Категория'
     )
+    rating_sum = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок'
+    )
 
     class Meta:
         default_related_name = 'titles'
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year',)
+        indexes = [
+            models.Index(fields=('-year', 'id'), name='title_year_id_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.category} - {self.genre} - {self.name} - {self.year}'
 
+    def save(self, *args, **kwargs):
+        """Сохраняем произведение, не трогая счётчики рейтинга.
+
+        Их меняют только атомарные UPDATE из reviews.ratings, иначе
+        save() вернул бы прочитанные ранее значения и потерял Отзывы,
+        учтённые после чтения.
+        """
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.attname not in RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        """Средняя оценка по сохранённым сумме и количеству оценок."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class TitleGenre(models.Model):
     """Модель жанров произведений."""
@@ -166,8 +210,49 @@ class Review(BaseCommentReviewModel):
                 name='unique_author_title'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        ]
         default_related_name = 'reviews'
 
+    def save(self, *args, **kwargs):
+        """Сохраняем Отзыв и рейтинг произведения в одной транзакции."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class TitleScore(models.Model):
+    """Количество Отзывов произведения с данной оценкой.
+
+    Обновляется сигналами при записи Отзывов, из этих строк
+    собирается гистограмма оценок произведения.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='scores',
+        verbose_name='Произведение'
+    )
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    count = models.IntegerField(default=0, verbose_name='Количество Отзывов')
+
+    class Meta:
+        verbose_name = 'Количество оценок'
+        verbose_name_plural = 'Количество оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.title_id}: {self.score} - {self.count}'
+
 
 class Comment(BaseCommentReviewModel):
     """Модель комментариев."""
@@ -184,4 +269,10 @@ class Comment(BaseCommentReviewModel):
 
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
         default_related_name = 'comments'
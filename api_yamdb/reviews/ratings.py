@@ -0,0 +1,81 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from api.cache import invalidate_objects
+from api.const import MAX_SCORE, MIN_SCORE
+from reviews.models import Review, Title, TitleScore
+
+
+def update_rating(title_id, score_delta, count_delta):
+    """Атомарно сдвигаем сумму и количество оценок произведения."""
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta
+    )
+
+
+def update_score_count(title_id, score, delta):
+    """Атомарно сдвигаем количество Отзывов с оценкой score."""
+    scores = TitleScore.objects.filter(title_id=title_id, score=score)
+    # Строки нет при удалении произведения вместе с его Отзывами.
+    if scores.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScore.objects.create(
+                title_id=title_id, score=score, count=delta
+            )
+    except IntegrityError:
+        # Строку успел создать параллельный запрос.
+        scores.update(count=F('count') + delta)
+
+
+def get_score_histogram(title_id):
+    """Количество Отзывов произведения по каждой оценке от MIN_SCORE."""
+    histogram = dict.fromkeys(range(MIN_SCORE, MAX_SCORE + 1), 0)
+    histogram.update(
+        TitleScore.objects.filter(title_id=title_id).values_list(
+            'score', 'count'
+        )
+    )
+    return histogram
+
+
+def recalculate_score_counts(queryset):
+    """Пересобираем гистограммы оценок произведений queryset."""
+    TitleScore.objects.filter(title__in=queryset).delete()
+    TitleScore.objects.bulk_create(
+        TitleScore(**row) for row in Review.objects.filter(
+            title__in=queryset
+        ).order_by().values('title_id', 'score').annotate(count=Count('id'))
+    )
+
+
+def recalculate_ratings(queryset=None):
+    """Пересчитываем рейтинги и гистограммы оценок по таблице Отзывов."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    recalculate_score_counts(queryset)
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    updated = queryset.update(
+        rating_sum=Coalesce(
+            Subquery(
+                reviews.annotate(total=Sum('score')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(
+                reviews.annotate(total=Count('id')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        )
+    )
+    # UPDATE без сигналов: сбрасываем кэши ответов и ETag вручную.
+    invalidate_objects(Title)
+    return updated
@@ -0,0 +1,277 @@
+"""Полнотекстовый поиск по произведениям и Отзывам.
+
+Поисковый индекс хранится в таблице SEARCH_TABLE: на SQLite это
+виртуальная таблица FTS5, на PostgreSQL таблица с колонкой tsvector и
+GIN-индексом. Если таблицы нет, используется индекс в памяти процесса.
+Индекс обновляется сигналами в reviews.signals.
+"""
+import math
+import re
+from collections import Counter
+
+from django.db import connection, transaction
+
+from reviews.models import Review, Title
+
+SEARCH_TABLE = 'reviews_search'
+
+# Код типа документа и функция, собирающая текст и scope документа.
+# scope ограничивает поиск, например Отзывами одного произведения.
+DOCUMENTS = {
+    Title: (0, lambda title: (
+        f'{title.name} {title.description or ""}', None
+    )),
+    Review: (1, lambda review: (review.text, review.title_id)),
+}
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [token.casefold() for token in TOKEN_RE.findall(text)]
+
+
+def document_rows(objs):
+    """Кортежи (модель, pk, текст, scope) для индексации."""
+    for obj in objs:
+        body, scope = DOCUMENTS[type(obj)][1](obj)
+        yield type(obj), obj.pk, body, scope
+
+
+class SQLiteSearchBackend:
+    """Поиск через FTS5; rowid документа кодирует его тип и pk."""
+
+    def rowid(self, model, pk):
+        return pk * len(DOCUMENTS) + DOCUMENTS[model][0]
+
+    def add(self, objs):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, body, scope) '
+                'VALUES (%s, %s, %s)',
+                [
+                    (self.rowid(model, pk), body, scope)
+                    for model, pk, body, scope in document_rows(objs)
+                ]
+            )
+
+    def remove(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                [self.rowid(model, pk)]
+            )
+
+    def clear(self, model):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid %% %s = %s',
+                [len(DOCUMENTS), DOCUMENTS[model][0]]
+            )
+
+    def search(self, model, terms, scope=None, limit=None):
+        # Каждое слово ищется как префикс: "шоушен"* найдёт "Шоушенка".
+        match = ' '.join(f'"{term}"*' for term in terms)
+        sql = (
+            f'SELECT rowid FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND rowid %% %s = %s'
+        )
+        params = [match, len(DOCUMENTS), DOCUMENTS[model][0]]
+        if scope is not None:
+            sql += ' AND scope = %s'
+            params.append(scope)
+        sql += f' ORDER BY bm25({SEARCH_TABLE}) LIMIT %s'
+        params.append(-1 if limit is None else limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [rowid // len(DOCUMENTS) for rowid, in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    """Поиск по колонке tsvector с ранжированием ts_rank."""
+
+    config = 'russian'
+
+    def add(self, objs):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (doc_type, doc_id, scope, body) '
+                'VALUES (%s, %s, %s, to_tsvector(%s, %s)) '
+                'ON CONFLICT (doc_type, doc_id) DO UPDATE '
+                'SET scope = EXCLUDED.scope, body = EXCLUDED.body',
+                [
+                    (DOCUMENTS[model][0], pk, scope, self.config, body)
+                    for model, pk, body, scope in document_rows(objs)
+                ]
+            )
+
+    def remove(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} '
+                'WHERE doc_type = %s AND doc_id = %s',
+                [DOCUMENTS[model][0], pk]
+            )
+
+    def clear(self, model):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE doc_type = %s',
+                [DOCUMENTS[model][0]]
+            )
+
+    def search(self, model, terms, scope=None, limit=None):
+        sql = (
+            f'SELECT doc_id FROM {SEARCH_TABLE}, '
+            'to_tsquery(%s, %s) query '
+            'WHERE doc_type = %s AND body @@ query'
+        )
+        params = [
+            self.config,
+            ' & '.join(f'{term}:*' for term in terms),
+            DOCUMENTS[model][0]
+        ]
+        if scope is not None:
+            sql += ' AND scope = %s'
+            params.append(scope)
+        sql += ' ORDER BY ts_rank(body, query) DESC, doc_id'
+        if limit is not None:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [doc_id for doc_id, in cursor.fetchall()]
+
+
+class PythonSearchBackend:
+    """Инвертированный индекс в памяти процесса.
+
+    Строится из БД при первом поиске и дальше обновляется сигналами
+    только этого процесса, поэтому подходит для разработки и тестов.
+    """
+
+    def __init__(self):
+        self.documents = None
+
+    def load(self):
+        if self.documents is None:
+            self.documents = {}
+            for model in DOCUMENTS:
+                self.add(model.objects.iterator())
+
+    def add(self, objs):
+        if self.documents is None:
+            return
+        for model, pk, body, scope in document_rows(objs):
+            self.documents[model, pk] = (Counter(tokenize(body)), scope)
+
+    def remove(self, model, pk):
+        if self.documents is not None:
+            self.documents.pop((model, pk), None)
+
+    def clear(self, model):
+        if self.documents is not None:
+            for key in [key for key in self.documents if key[0] is model]:
+                del self.documents[key]
+
+    def search(self, model, terms, scope=None, limit=None):
+        self.load()
+        candidates = [
+            (pk, tokens) for (doc_model, pk), (tokens, doc_scope)
+            in self.documents.items()
+            if doc_model is model and (scope is None or doc_scope == scope)
+        ]
+        counts = {}
+        frequency = Counter()
+        for pk, tokens in candidates:
+            counts[pk] = {
+                term: sum(
+                    tf for token, tf in tokens.items()
+                    if token.startswith(term)
+                )
+                for term in terms
+            }
+            frequency.update(term for term in terms if counts[pk][term])
+        matches = {
+            pk: term_counts for pk, term_counts in counts.items()
+            if all(term_counts.values())
+        }
+        # TF-IDF: редкие слова весят больше частых.
+        idf = {
+            term: math.log(1 + len(candidates) / frequency[term])
+            for term in terms if frequency[term]
+        }
+        ranked = sorted(
+            matches,
+            key=lambda pk: (
+                -sum(count * idf[term] for term, count in matches[pk].items()),
+                pk
+            )
+        )
+        return ranked if limit is None else ranked[:limit]
+
+
+_python_backend = PythonSearchBackend()
+
+# Выбранный бэкенд для каждой БД, чтобы не проверять таблицу при каждом
+# сохранении: {имя БД: бэкенд}.
+_backends = {}
+
+
+def get_search_backend():
+    name = connection.settings_dict['NAME']
+    backend = _backends.get(name)
+    if backend is None:
+        backend = _python_backend
+        if SEARCH_TABLE in connection.introspection.table_names():
+            if connection.vendor == 'sqlite':
+                backend = SQLiteSearchBackend()
+            elif connection.vendor == 'postgresql':
+                backend = PostgresSearchBackend()
+        _backends[name] = backend
+    return backend
+
+
+def index_document(obj):
+    """Добавляем или обновляем документ obj в индексе."""
+    backend = get_search_backend()
+    backend.remove(type(obj), obj.pk)
+    backend.add([obj])
+
+
+def index_documents(objs):
+    """index_document для нескольких документов, например после bulk_create."""
+    backend = get_search_backend()
+    objs = list(objs)
+    for obj in objs:
+        backend.remove(type(obj), obj.pk)
+    backend.add(objs)
+
+
+def remove_document(model, pk):
+    get_search_backend().remove(model, pk)
+
+
+def rebuild_index(model, batch_size=1000):
+    """Переиндексируем все документы model, например после loadcsv."""
+    backend = get_search_backend()
+    with transaction.atomic():
+        backend.clear(model)
+        batch = []
+        for obj in model.objects.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                backend.add(batch)
+                batch = []
+        backend.add(batch)
+
+
+def search(model, query, scope=None, limit=None):
+    """pk документов model, подходящих под query, от лучшего к худшему.
+
+    Все слова запроса обязательны и ищутся как префиксы.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    return get_search_backend().search(model, terms, scope, limit)
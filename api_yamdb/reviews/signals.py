@@ -0,0 +1,59 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+from reviews.ratings import update_rating, update_score_count
+from reviews.search import index_document, remove_document
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, raw, **kwargs):
+    """Запоминаем оценку Отзыва до изменения.
+
+    Строка блокируется до конца транзакции Review.save, чтобы
+    параллельное изменение не учлось в рейтинге дважды.
+    """
+    instance._previous_score = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_score = sender.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('score', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def add_score_to_rating(sender, instance, created, raw, **kwargs):
+    """Учитываем новую или изменённую оценку в рейтинге произведения."""
+    if raw:
+        return
+    if created:
+        update_rating(instance.title_id, instance.score, 1)
+        update_score_count(instance.title_id, instance.score, 1)
+        return
+    previous_score = getattr(instance, '_previous_score', None)
+    if previous_score is not None and previous_score != instance.score:
+        update_rating(instance.title_id, instance.score - previous_score, 0)
+        update_score_count(instance.title_id, previous_score, -1)
+        update_score_count(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_score_from_rating(sender, instance, **kwargs):
+    """Убираем оценку удалённого Отзыва из рейтинга произведения."""
+    update_rating(instance.title_id, -instance.score, -1)
+    update_score_count(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+def update_search_index(sender, instance, raw, **kwargs):
+    """Обновляем документ в поисковом индексе."""
+    if not raw:
+        index_document(instance)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Удаляем документ из поискового индекса."""
+    remove_document(sender, instance.pk)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from users.models import User
+from users.models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -20,3 +20,16 @@ class UserAdmin(BaseUserAdmin):
          {'fields': ('first_name', 'last_name', 'bio', 'email')}
          )
     )
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'to_email',
+        'subject',
+        'created',
+        'sent',
+        'attempts'
+    )
+    list_filter = ('sent',)
@@ -0,0 +1,146 @@
+"""Очередь исходящих писем и их пакетная отправка."""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.const import (
+    EMAIL_CLAIM_TIMEOUT,
+    EMAIL_RETRY_DELAY,
+    EMAIL_SEND_MAX_ATTEMPTS
+)
+from users.models import OutgoingEmail
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_WORKERS = 4
+
+
+def queue_email(subject, body, to_email):
+    """Ставим письмо в очередь, не дожидаясь SMTP-сервера.
+
+    При EMAIL_OUTBOX_EAGER письмо отправляется сразу после коммита.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=settings.EMAIL,
+        to_email=to_email
+    )
+    if settings.EMAIL_OUTBOX_EAGER:
+        transaction.on_commit(send_pending)
+    return email
+
+
+def send_chunk(emails):
+    """Отправляем письма через одно SMTP-соединение.
+
+    Возвращает список пар (id письма, текст ошибки или None).
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        return [(email.id, str(error)) for email in emails]
+    results = []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.to_email],
+                connection=connection
+            )
+            try:
+                message.send()
+                results.append((email.id, None))
+            except Exception as error:
+                results.append((email.id, str(error)))
+    finally:
+        connection.close()
+    return results
+
+
+def claim_pending(batch_size):
+    """Забираем пачку неотправленных писем себе.
+
+    Письма помечаются своей отметкой одним UPDATE с повторной проверкой
+    условий, поэтому параллельные обработчики не берут одно письмо
+    дважды. Где можно, строки выбираются через SKIP LOCKED, чтобы
+    обработчики не ждали друг друга. Отметка упавшего обработчика
+    устаревает через EMAIL_CLAIM_TIMEOUT. Письма после неудачной попытки
+    ждут своего next_attempt.
+    """
+    now = timezone.now()
+    pending = OutgoingEmail.objects.filter(
+        Q(claimed__isnull=True)
+        | Q(claimed__lt=now - timedelta(seconds=EMAIL_CLAIM_TIMEOUT)),
+        Q(next_attempt__isnull=True) | Q(next_attempt__lte=now),
+        sent__isnull=True,
+        attempts__lt=EMAIL_SEND_MAX_ATTEMPTS
+    )
+    claim = uuid.uuid4()
+    with transaction.atomic():
+        candidates = pending
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('id', flat=True)[:batch_size])
+        pending.filter(id__in=ids).update(claim=claim, claimed=now)
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой растёт вдвое после каждой неудачи."""
+    return timedelta(seconds=EMAIL_RETRY_DELAY * 2 ** attempts)
+
+
+def send_emails(emails, workers=DEFAULT_WORKERS):
+    """Отправляем взятые письма в workers потоках.
+
+    Каждый поток отправляет свою часть пачки через одно соединение,
+    отметка об успешной отправке сохраняется одним UPDATE на всю пачку.
+    Текст отправленного письма стирается: в нём коды подтверждения.
+    Неудачные письма откладываются с экспоненциальной паузой.
+    Возвращает количество отправленных писем.
+    """
+    if not emails:
+        return 0
+    workers = max(1, min(workers, len(emails)))
+    chunks = [emails[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(workers) as executor:
+        results = [
+            result
+            for chunk_results in executor.map(send_chunk, chunks)
+            for result in chunk_results
+        ]
+    sent_ids = [email_id for email_id, error in results if error is None]
+    now = timezone.now()
+    OutgoingEmail.objects.filter(id__in=sent_ids).update(
+        sent=now,
+        attempts=F('attempts') + 1,
+        error='',
+        body='',
+        claim=None,
+        claimed=None
+    )
+    attempts = {email.id: email.attempts for email in emails}
+    for email_id, error in results:
+        if error is not None:
+            OutgoingEmail.objects.filter(id=email_id).update(
+                attempts=F('attempts') + 1,
+                error=error,
+                next_attempt=now + retry_delay(attempts[email_id]),
+                claim=None,
+                claimed=None
+            )
+    return len(sent_ids)
+
+
+def send_pending(batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
+    """Берём и отправляем пачку писем, возвращаем число отправленных."""
+    return send_emails(claim_pending(batch_size), workers)
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.mailing import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_WORKERS,
+    claim_pending,
+    send_emails
+)
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди OutgoingEmail.\n'
+            'Пример команды: python manage.py send_emails --interval 5')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить накопившиеся письма и завершиться'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Сколько писем выбирать из очереди за раз'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Количество потоков с собственным SMTP-соединением'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            emails = claim_pending(options['batch_size'])
+            sent = send_emails(emails, options['workers'])
+            if sent:
+                self.stdout.write(f'Отправлено писем: {sent}')
+            # Неудачные письма отложены до next_attempt, поэтому пустая
+            # выборка значит, что сейчас отправлять нечего.
+            if not emails:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_username_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claim',
+            field=models.UUIDField(blank=True, editable=False, null=True, verbose_name='Отметка обработчика'),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято в отправку'),
+        ),
+    ]
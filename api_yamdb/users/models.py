@@ -2,7 +2,11 @@ from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.db import models
 
-from api.const import EMAIL_MAX_LENGTH, ROLE_MAX_LENGTH
+from api.const import (
+    EMAIL_MAX_LENGTH,
+    EMAIL_SUBJECT_MAX_LENGTH,
+    ROLE_MAX_LENGTH
+)
 
 
 class User(AbstractUser):
@@ -53,3 +57,54 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField('Тема', max_length=EMAIL_SUBJECT_MAX_LENGTH)
+    body = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель',
+        max_length=EMAIL_MAX_LENGTH
+    )
+    to_email = models.EmailField(
+        'Получатель',
+        max_length=EMAIL_MAX_LENGTH
+    )
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent = models.DateTimeField(
+        'Отправлено',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попытки отправки',
+        default=0
+    )
+    error = models.TextField('Последняя ошибка', blank=True)
+    claim = models.UUIDField(
+        'Отметка обработчика',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    claimed = models.DateTimeField(
+        'Взято в отправку',
+        null=True,
+        blank=True
+    )
+    next_attempt = models.DateTimeField(
+        'Следующая попытка',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.to_email} - {self.subject}'
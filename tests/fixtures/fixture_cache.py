@@ -0,0 +1,23 @@
+import copy
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_caches(tmp_path_factory):
+    """Файловый кэш тестов во временной папке, а не в кэше dev-сервера."""
+    test_caches = copy.deepcopy(settings.CACHES)
+    test_caches['default']['LOCATION'] = str(tmp_path_factory.mktemp('cache'))
+    with override_settings(CACHES=test_caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """БД очищается между тестами, поэтому и кэши должны очищаться."""
+    for cache in caches.all():
+        cache.clear()
+    yield
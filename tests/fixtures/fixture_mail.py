@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def send_emails_eagerly(settings):
+    """В тестах письма из очереди отправляются сразу после коммита."""
+    settings.EMAIL_OUTBOX_EAGER = True
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, client, admin_client, admin,
+                                       user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения учитывает новые Отзывы.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения учитывает изменение оценки.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения учитывает удаление Отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Если у произведения не осталось Отзывов, рейтинг должен быть '
+            '`None`.'
+        )
+
+    def test_02_recalculate_ratings_command(self, client, admin_client,
+                                            admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        Title.objects.update(rating_sum=0, rating_count=0)
+        assert self.get_rating(client, title_id) is None
+
+        call_command('recalculate_ratings')
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'рейтинги произведений.'
+        )
+
+    def test_03_title_save_keeps_rating(self, client, admin_client, admin,
+                                        user_client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        stale = Title.objects.get(pk=title_id)
+        create_single_review(user_client, title_id, 'Текст', 9)
+        stale.name = 'Новое название'
+        stale.save()
+        response = admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            data={'description': 'Описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get(pk=title_id)
+        assert (title.name, title.rating_sum, title.rating_count) == (
+            'Новое название', 14, 2
+        ), (
+            'Проверьте, что сохранение произведения не перезаписывает '
+            'сумму и количество оценок прочитанными ранее значениями.'
+        )
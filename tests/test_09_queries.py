@@ -0,0 +1,256 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import (
+    get_cache,
+    get_catalog,
+    get_versions,
+    set_new_version,
+    table_version_names
+)
+from reviews.models import Comment, Genre, Review, Title, TitleScore
+from tests.utils import create_genre, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_many_titles(self, admin_client, count):
+        titles, _, _ = create_titles(admin_client)
+        title = titles[0]
+        for idx in range(count):
+            admin_client.post(
+                self.TITLES_URL,
+                data={**title, 'name': f'{title["name"]} {idx}'}
+            )
+
+    @pytest.mark.parametrize('limit', (2, 20))
+    def test_01_titles_list_queries(self, client, admin_client,
+                                    django_assert_num_queries, limit):
+        self.create_many_titles(admin_client, 20)
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL, {'limit': limit})
+        assert len(response.json()['results']) == limit, (
+            f'Проверьте, что `{self.TITLES_URL}` загружает жанры и '
+            'категории произведений постоянным числом запросов.'
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+        assert len(response.json()['genre']) == len(titles[0]['genre'])
+
+    def test_03_catalog_list_from_cache(self, client, admin_client,
+                                        django_assert_num_queries):
+        genres = create_genre(admin_client)
+        client.get(self.GENRES_URL)
+        with django_assert_num_queries(0):
+            response = client.get(self.GENRES_URL, {'search': 'Ко'})
+        assert response.json()['results'] == [genres[1]], (
+            f'Проверьте, что `{self.GENRES_URL}` ищет по закэшированному '
+            'каталогу жанров.'
+        )
+
+        new_genre = {'name': 'Вестерн', 'slug': 'western'}
+        admin_client.post(self.GENRES_URL, data=new_genre)
+        response = client.get(self.GENRES_URL)
+        assert new_genre in response.json()['results'], (
+            'Проверьте, что после создания жанра кэш каталога сбрасывается.'
+        )
+
+    @pytest.mark.parametrize('data, expected_queries', (
+        ({'username': 'new_user', 'email': 'new@yamdb.fake'}, 4),
+        ({'username': 'TestUser', 'email': 'testuser@yamdb.fake'}, 3),
+        ({'username': 'TestUser', 'email': 'other@yamdb.fake'}, 1),
+        ({'username': 'other', 'email': 'testuser@yamdb.fake'}, 1),
+    ), ids=('new user', 'repeat user', 'username taken', 'email taken'))
+    def test_04_signup_queries(self, client, user, settings, data,
+                               expected_queries):
+        settings.EMAIL_OUTBOX_EAGER = False
+        with CaptureQueriesContext(connection) as context:
+            client.post(self.SIGNUP_URL, data=data)
+        assert len(context.captured_queries) == expected_queries, (
+            f'Проверьте, что `{self.SIGNUP_URL}` ищет пользователя одним '
+            'запросом, а пользователь и письмо сохраняются в одной '
+            'транзакции.\n' + '\n'.join(
+                query['sql'] for query in context.captured_queries
+            )
+        )
+
+    def test_05_cached_count(self, client, admin_client,
+                             django_assert_num_queries):
+        titles, _, genres = create_titles(admin_client)
+        params = {'genre': genres[0]['slug']}
+        # Анонимные ответы кэшируются целиком, поэтому счётчик
+        # проверяем на запросах администратора. Токен фикстуры без claims
+        # роли, и пользователь загружается третьим запросом.
+        assert admin_client.get(
+            self.TITLES_URL, params
+        ).json()['count'] == 1
+        with django_assert_num_queries(3):
+            response = admin_client.get(self.TITLES_URL, params)
+        assert response.json()['count'] == 1, (
+            f'Проверьте, что `{self.TITLES_URL}` берёт количество '
+            'произведений для фильтра из кэша.'
+        )
+
+        admin_client.post(self.TITLES_URL, data={**titles[0], 'name': 'Новое'})
+        assert client.get(self.TITLES_URL, params).json()['count'] == 2, (
+            'Проверьте, что кэш количества сбрасывается при записи.'
+        )
+
+    def test_06_comment_create_queries(self, admin_client, user, user_client,
+                                       django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        # Пользователь из токена фикстуры, Отзыв вместе с проверкой
+        # произведения, INSERT и автор для ответа.
+        with django_assert_num_queries(4):
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{url}` ищет Отзыв один раз.'
+        )
+        other_title = titles[1]['id']
+        response = user_client.post(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=other_title, review_id=reviews[0]['id']
+            ),
+            data={'text': 'Комментарий'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что Комментарий нельзя добавить к Отзыву '
+            'другого произведения.'
+        )
+        comment_id = user_client.get(url).json()['results'][0]['id']
+        response = user_client.get(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=other_title, review_id=reviews[0]['id']
+            ) + f'{comment_id}/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что Комментарий не найден через другое произведение.'
+        )
+
+    @pytest.mark.parametrize('limit', (2, 20))
+    def test_07_reviews_and_comments_list_queries(
+        self, client, admin_client, django_user_model,
+        django_assert_num_queries, limit
+    ):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(20)
+        ]
+        reviews = [
+            Review.objects.create(
+                title_id=title_id, author=author, text='Отзыв', score=5
+            )
+            for author in authors
+        ]
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+        urls = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0].id
+            ),
+        )
+        for url in urls:
+            # Родитель, COUNT и страница вместе с авторами.
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, {'limit': limit})
+            results = response.json()['results']
+            assert len(results) == limit
+            assert {item['author'] for item in results} <= {
+                author.username for author in authors
+            }
+            assert len(context.captured_queries) == 3, (
+                f'Проверьте, что `{url}` загружает авторов в том же '
+                'запросе, что и страницу.\n' + '\n'.join(
+                    query['sql'] for query in context.captured_queries
+                )
+            )
+            assert 'users_user"."email' not in (
+                context.captured_queries[-1]['sql']
+            ), 'Проверьте, что у автора загружается только username.'
+
+    def test_08_local_catalog_expires(self, settings):
+        settings.CATALOG_CACHE_TIMEOUT = 0
+        assert get_catalog(Genre) == {}
+        # Жанр из другого процесса: версия каталога здесь не менялась.
+        Genre.objects.create(name='Вестерн', slug='western')
+        assert 'western' in get_catalog(Genre), (
+            'Проверьте, что копия каталога в памяти процесса устаревает '
+            'через CATALOG_CACHE_TIMEOUT, даже если версия не менялась.'
+        )
+
+    def test_09_table_versions_only_for_cached_tables(self):
+        scores = TitleScore.objects.all()
+        assert Collector(scores.db).can_fast_delete(scores), (
+            'Проверьте, что обработчик сброса кэшей таблиц подключён '
+            'только к нужным моделям и не отключает быстрое удаление.'
+        )
+        names = table_version_names(TitleScore, Title)
+        before = get_versions(names)
+        title = Title.objects.create(name='Новое', year=2000)
+        TitleScore.objects.create(title=title, score=5, count=1)
+        after = get_versions(names)
+        assert after[0] == before[0], (
+            'Проверьте, что запись в таблицу без кэшей не меняет версий.'
+        )
+        assert after[1] != before[1]
+
+    def test_10_shared_cache_settings(self):
+        cache = get_cache()
+        assert str(connection.settings_dict['NAME']) in cache.make_key(
+            'version:x'
+        ), (
+            'Проверьте, что ключи общего кэша содержат имя БД: тестовая и '
+            'рабочая БД не должны делить версии.'
+        )
+        assert cache._max_entries > 300, (
+            'Проверьте, что для общего кэша задан MAX_ENTRIES: при 300 '
+            'записях вытесняются отпечатки пользователей и версии.'
+        )
+        set_new_version('x')
+        first = get_versions(['x'])
+        set_new_version('x')
+        assert get_versions(['x']) != first
+
+    def test_11_catalog_follows_orm_changes(self, client):
+        etag = client.get(self.GENRES_URL)['ETag']
+        assert get_catalog(Genre) == {}
+        genre = Genre.objects.create(name='Вестерн', slug='western')
+        assert 'western' in get_catalog(Genre), (
+            'Проверьте, что каталог сбрасывается при изменении Жанра не '
+            'через API, например из админки.'
+        )
+        assert client.get(self.GENRES_URL)['ETag'] != etag
+        genre.delete()
+        assert get_catalog(Genre) == {}
@@ -0,0 +1,165 @@
+import csv
+import os
+from datetime import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.authentication import (
+    get_auth_stamp,
+    get_stamp_cache,
+    stamp_cache_key
+)
+from api.cache import get_catalog
+from reviews.models import Category, Comment, Review, Title, TitleGenre
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10LoadCSV:
+
+    def count_rows(self, file_name):
+        with open(os.path.join(DATA_PATH, file_name), encoding='utf-8') as f:
+            return sum(1 for _ in csv.reader(f)) - 1
+
+    def test_01_load_all(self, django_user_model):
+        call_command('loadcsv', DATA_PATH, '--all', '--batch-size', '10')
+        expected = (
+            (django_user_model, 'users.csv'),
+            (Title, 'titles.csv'),
+            (TitleGenre, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        )
+        for model, file_name in expected:
+            assert model.objects.count() == self.count_rows(file_name), (
+                'Проверьте, что `loadcsv --all` загружает все строки '
+                f'файла `{file_name}`.'
+            )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после `loadcsv --all` рейтинги произведений '
+            'пересчитываются.'
+        )
+
+    def test_02_reload_updates_rows(self, django_user_model):
+        call_command('loadcsv', DATA_PATH, '--all')
+        call_command('loadcsv', DATA_PATH, '--all')
+        assert Review.objects.count() == self.count_rows('review.csv'), (
+            'Проверьте, что повторная загрузка обновляет существующие '
+            'строки, а не дублирует их.'
+        )
+
+    def write_csv(self, path, rows):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(rows)
+        return str(path)
+
+    def load_file(self, path, model_name, *args):
+        stdout = StringIO()
+        call_command(
+            'loadcsv', path, 'reviews', model_name, *args, stdout=stdout
+        )
+        return stdout.getvalue()
+
+    def test_03_single_file_coerces_types(self, tmp_path):
+        call_command(
+            'loadcsv', os.path.join(DATA_PATH, 'users.csv'), 'users', 'User'
+        )
+        self.load_file(os.path.join(DATA_PATH, 'category.csv'), 'Category')
+        titles = self.write_csv(tmp_path / 'titles.csv', [
+            ('id', 'name', 'year', 'category_id'),
+            ('7', 'Фильм', '1994', '1'),
+        ])
+        self.load_file(titles, 'Title')
+        reviews = self.write_csv(tmp_path / 'review.csv', [
+            ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+            ('3', '7', 'Текст', '100', '8', '2019-09-24T21:08:21.567Z'),
+        ])
+        self.load_file(reviews, 'Review')
+        title = Title.objects.get(pk=7)
+        assert (title.year, title.category_id) == (1994, 1), (
+            'Проверьте, что `loadcsv` приводит значения к типам полей.'
+        )
+        review = Review.objects.get(pk=3)
+        assert review.score == 8
+        assert isinstance(review.pub_date, datetime)
+        assert review.pub_date.year == 2019
+        title.refresh_from_db()
+        assert title.rating_count == 1, (
+            'Проверьте, что после загрузки Отзывов одним файлом рейтинг '
+            'пересчитывается.'
+        )
+
+    def test_04_single_file_reimport_updates(self, tmp_path):
+        path = tmp_path / 'category.csv'
+        self.load_file(self.write_csv(path, [
+            ('id', 'name', 'slug'),
+            ('1', 'Фильм', 'movie'),
+        ]), 'Category')
+        self.load_file(self.write_csv(path, [
+            ('id', 'name', 'slug'),
+            ('1', 'Кино', 'movie'),
+            ('2', 'Книга', 'book'),
+        ]), 'Category')
+        assert list(
+            Category.objects.order_by('pk').values_list('pk', 'name')
+        ) == [(1, 'Кино'), (2, 'Книга')], (
+            'Проверьте, что повторная загрузка файла обновляет строки с '
+            'существующим id и добавляет новые.'
+        )
+        Category.objects.create(name='Музыка', slug='music')
+
+    def test_05_single_file_batch_size(self, tmp_path):
+        path = self.write_csv(tmp_path / 'category.csv', [
+            ('id', 'name', 'slug'),
+            *((str(idx), f'Категория {idx}', f'c{idx}') for idx in range(5)),
+        ])
+        output = self.load_file(path, 'Category', '--batch-size', '2')
+        assert output.count('Загружено строк') == 3, (
+            'Проверьте, что `--batch-size` задаёт размер пакета.'
+        )
+        assert 'Загружено строк: 5' in output
+        assert Category.objects.count() == 5
+
+    def test_06_single_file_invalidates_caches(self, tmp_path,
+                                               django_user_model):
+        path = tmp_path / 'category.csv'
+        self.load_file(self.write_csv(path, [
+            ('id', 'name', 'slug'),
+            ('1', 'Фильм', 'movie'),
+        ]), 'Category')
+        assert set(get_catalog(Category)) == {'movie'}
+        self.load_file(self.write_csv(path, [
+            ('id', 'name', 'slug'),
+            ('2', 'Книга', 'book'),
+        ]), 'Category')
+        assert set(get_catalog(Category)) == {'movie', 'book'}, (
+            'Проверьте, что `loadcsv` сбрасывает каталог загруженной модели.'
+        )
+
+        users = os.path.join(DATA_PATH, 'users.csv')
+        call_command('loadcsv', users, 'users', 'User')
+        user = django_user_model.objects.get(username='bingobongo')
+        get_auth_stamp(user.pk)
+        call_command('loadcsv', users, 'users', 'User')
+        assert get_stamp_cache().get(stamp_cache_key(user.pk)) is None, (
+            'Проверьте, что после загрузки пользователей их отпечатки '
+            'сбрасываются.'
+        )
+
+    def test_07_load_all_missing_directory(self, tmp_path):
+        for path in (tmp_path / 'missing', tmp_path):
+            with pytest.raises(CommandError):
+                call_command('loadcsv', str(path), '--all')
+        assert not Title.objects.exists()
+
+    def test_08_load_all_invalidates_caches(self, client):
+        assert client.get('/api/v1/categories/').json()['count'] == 0
+        call_command('loadcsv', DATA_PATH, '--all')
+        assert client.get('/api/v1/categories/').json()['count'] == (
+            self.count_rows('category.csv')
+        ), 'Проверьте, что `loadcsv --all` сбрасывает кэши ответов.'
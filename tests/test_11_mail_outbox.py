@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.const import EMAIL_CLAIM_TIMEOUT
+from users import mailing
+from users.mailing import claim_pending, queue_email, send_pending
+from users.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11MailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        outbox_before_count = len(mail.outbox)
+        for idx in range(5):
+            response = client.post(
+                self.URL_SIGNUP,
+                data={'username': f'user{idx}', 'email': f'u{idx}@yamdb.fake'}
+            )
+            assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что `{self.URL_SIGNUP}` не отправляет письмо '
+            'во время запроса, а ставит его в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(sent__isnull=True).count() == 5
+
+        call_command('send_emails', '--once', '--workers', '2')
+        assert len(mail.outbox) == outbox_before_count + 5, (
+            'Проверьте, что команда `send_emails` отправляет письма из '
+            'очереди.'
+        )
+        assert not OutgoingEmail.objects.filter(sent__isnull=True).exists()
+        recipients = {
+            address
+            for message in mail.outbox[outbox_before_count:]
+            for address in message.to
+        }
+        assert recipients == {f'u{idx}@yamdb.fake' for idx in range(5)}
+
+    def test_02_claimed_emails_not_sent_twice(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        emails = [
+            queue_email('Код', f'Код {idx}', f'u{idx}@yamdb.fake')
+            for idx in range(3)
+        ]
+        claimed = claim_pending(batch_size=2)
+        assert len(claimed) == 2
+        assert [email.id for email in claim_pending(batch_size=10)] == [
+            emails[2].id
+        ], 'Проверьте, что письмо не забирают два обработчика сразу.'
+        assert send_pending() == 0
+
+        stale = timezone.now() - timedelta(seconds=EMAIL_CLAIM_TIMEOUT + 1)
+        OutgoingEmail.objects.filter(id=emails[0].id).update(claimed=stale)
+        outbox_before_count = len(mail.outbox)
+        assert send_pending() == 1, (
+            'Проверьте, что письма упавшего обработчика отправляются после '
+            'EMAIL_CLAIM_TIMEOUT.'
+        )
+        assert mail.outbox[outbox_before_count].body == 'Код 0'
+
+    def test_03_sent_body_cleared(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        queue_email('Код', 'Код 12345', 'user@yamdb.fake')
+        assert send_pending() == 1
+        email = OutgoingEmail.objects.get()
+        assert email.sent is not None and email.claim is None
+        assert email.body == '', (
+            'Проверьте, что текст с кодом подтверждения стирается после '
+            'отправки.'
+        )
+
+    def fail_for(self, monkeypatch, address):
+        send_chunk = mailing.send_chunk
+
+        def failing_send_chunk(emails):
+            failed = [email for email in emails if email.to_email == address]
+            results = send_chunk(
+                [email for email in emails if email not in failed]
+            )
+            return results + [
+                (email.id, 'SMTP недоступен') for email in failed
+            ]
+
+        monkeypatch.setattr(mailing, 'send_chunk', failing_send_chunk)
+
+    def test_04_failed_email_backoff(self, settings, monkeypatch):
+        settings.EMAIL_OUTBOX_EAGER = False
+        email = queue_email('Код', 'Код 1', 'down@yamdb.fake')
+        self.fail_for(monkeypatch, 'down@yamdb.fake')
+        assert send_pending() == 0
+        assert send_pending() == 0
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что после ошибки письмо ждёт паузу перед '
+            'следующей попыткой.'
+        )
+        first_delay = email.next_attempt - timezone.now()
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        send_pending()
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt - timezone.now() > first_delay, (
+            'Проверьте, что пауза растёт с каждой неудачной попыткой.'
+        )
+
+    def test_05_once_sends_past_failed_batch(self, settings, monkeypatch):
+        settings.EMAIL_OUTBOX_EAGER = False
+        queue_email('Код', 'Код 0', 'down@yamdb.fake')
+        for idx in range(1, 3):
+            queue_email('Код', f'Код {idx}', f'u{idx}@yamdb.fake')
+        self.fail_for(monkeypatch, 'down@yamdb.fake')
+        outbox_before_count = len(mail.outbox)
+        call_command('send_emails', '--once', '--batch-size', '1')
+        assert len(mail.outbox) == outbox_before_count + 2, (
+            'Проверьте, что `send_emails --once` не останавливается на '
+            'пачке, где письма не отправились.'
+        )
@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+
+from api.checks import check_auth_stamp_cache
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Auth:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_ME = '/api/v1/users/me/'
+    URL_TITLES = '/api/v1/titles/'
+
+    def test_01_token_single_query(self, client, user,
+                                   django_assert_num_queries):
+        data = {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)
+        }
+        with django_assert_num_queries(1):
+            response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.URL_TOKEN}` выдаёт токен за один запрос '
+            'к БД.'
+        )
+        assert 'token' in response.json()
+
+    def test_02_token_rate_limit(self, client, user):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        statuses = {
+            client.post(self.URL_TOKEN, data=data).status_code
+            for _ in range(25)
+        }
+        assert HTTPStatus.TOO_MANY_REQUESTS in statuses, (
+            f'Проверьте, что число попыток получить токен в `{self.URL_TOKEN}` '
+            'для одного username ограничено.'
+        )
+        response = client.post(
+            self.URL_TOKEN, data=data, REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неудачные попытки с одного адреса не блокируют '
+            'получение токена этим пользователем с другого адреса.'
+        )
+
+    def get_token(self, client, user):
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)
+        })
+        return response.json()['token']
+
+    def test_03_authentication_without_user_query(
+            self, user, django_assert_num_queries):
+        client = APIClient()
+        token = self.get_token(client, user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = client.get(self.URL_ME)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == user.username
+
+        # Единственный запрос - COUNT пустого списка произведений.
+        with django_assert_num_queries(1):
+            response = client.get(self.URL_TITLES)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что аутентификация по токену с ролью не обращается '
+            'к БД за пользователем.'
+        )
+
+    def test_04_role_change_revokes_token(self, admin_client, user):
+        client = APIClient()
+        token = self.get_token(client, user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert client.get(self.URL_ME).status_code == HTTPStatus.OK
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что после смены роли старый токен отзывается.'
+
+    def test_05_stamp_cache_must_be_shared(self, settings):
+        assert check_auth_stamp_cache(None) == []
+        settings.CACHES = {
+            **settings.CACHES,
+            'stamps': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            },
+        }
+        settings.AUTH_STAMP_CACHE_ALIAS = 'stamps'
+        errors = check_auth_stamp_cache(None)
+        assert [error.id for error in errors] == ['api.E001'], (
+            'Проверьте, что кэш отпечатков в памяти процесса считается '
+            'ошибкой конфигурации: отзыв токенов не дойдёт до других '
+            'процессов.'
+        )
+
+    def test_06_token_non_object_body(self, client):
+        response = client.post(
+            self.URL_TOKEN, data=['username'], content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что тело-список в `{self.URL_TOKEN}` возвращает '
+            'ответ со статусом 400.'
+        )
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def walk(self, client, url, params, link_key):
+        ids = []
+        response = client.get(url, params)
+        while True:
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert data['count'] is None, (
+                f'Проверьте, что в режиме курсора `{url}` не считает '
+                'количество объектов.'
+            )
+            ids.append([obj['id'] for obj in data['results']])
+            if not data[link_key]:
+                return ids, data
+            response = client.get(data[link_key])
+
+    def test_01_titles_cursor_matches_offset(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for idx, year in enumerate((1984, 1984, 1984, 2000, 1950)):
+            admin_client.post(
+                self.TITLES_URL,
+                data={**titles[0], 'name': f'Тайтл {idx}', 'year': year}
+            )
+        expected = [
+            obj['id'] for obj in
+            client.get(self.TITLES_URL, {'limit': 100}).json()['results']
+        ]
+
+        pages, last = self.walk(
+            client, self.TITLES_URL, {'cursor': '', 'limit': 2}, 'next'
+        )
+        assert [obj_id for page in pages for obj_id in page] == expected, (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'обходит произведения в порядке `-year, id` без пропусков и '
+            'повторов.'
+        )
+        back_pages, _ = self.walk(
+            client, last['previous'], {}, 'previous'
+        )
+        assert [
+            obj_id for page in reversed(back_pages) for obj_id in page
+        ] == expected[:-len(pages[-1])], (
+            'Проверьте, что ссылка `previous` в режиме курсора ведёт на '
+            'предыдущие страницы.'
+        )
+
+    def test_02_reviews_cursor_without_count(self, admin_client, admin,
+                                             user_client, user,
+                                             moderator_client, moderator):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        pages, _ = self.walk(
+            admin_client, url, {'cursor': '', 'limit': 2}, 'next'
+        )
+        assert [obj_id for page in pages for obj_id in page] == [
+            review['id'] for review in reversed(reviews)
+        ]
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(self.TITLES_URL, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Проверяется план SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test14ListIndexes:
+
+    def list_query_plan(self, client, url, table):
+        """План SELECT-запроса страницы списка, выполненного эндпоинтом."""
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+            and 'ORDER BY' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_01_list_endpoints_use_indexes(self, client, admin_client,
+                                           admin, user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        expected = (
+            ('/api/v1/titles/', 'reviews_title', 'title_year_id_idx'),
+            (
+                f'/api/v1/titles/{title_id}/reviews/',
+                'reviews_review',
+                'review_title_pub_date_idx'
+            ),
+            (
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                'reviews_comment',
+                'comment_review_pub_date_idx'
+            ),
+        )
+        for url, table, index in expected:
+            plan = self.list_query_plan(client, url, table)
+            assert index in plan, (
+                f'Проверьте, что список `{url}` выбирается по индексу '
+                f'`{index}`. План запроса: {plan}'
+            )
+            assert 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что список `{url}` не сортируется отдельно от '
+                f'индекса. План запроса: {plan}'
+            )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+from reviews.search import PythonSearchBackend, search
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Search:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def search_ids(self, client, url, query):
+        response = client.get(url, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [obj['id'] for obj in response.json()['results']]
+
+    def test_01_titles_search_by_prefix(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.search_ids(client, self.TITLES_URL, 'терминат') == [
+            titles[0]['id']
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?search=` находит '
+            'произведения по началу слова из названия.'
+        )
+        assert self.search_ids(client, self.TITLES_URL, 'yippie') == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?search=` ищет и по описанию.'
+        )
+        assert self.search_ids(client, self.TITLES_URL, 'нет такого') == []
+
+    def test_02_titles_search_ranked(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data = {**titles[0], 'description': 'Фильм про фильм: фильм фильм'}
+        data.pop('id')
+        data['name'] = 'Фильм'
+        best_id = admin_client.post(self.TITLES_URL, data=data).json()['id']
+        data.update(name='Другое', description='Снова фильм')
+        other_id = admin_client.post(self.TITLES_URL, data=data).json()['id']
+        assert self.search_ids(client, self.TITLES_URL, 'фильм') == [
+            best_id, other_id
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?search=` возвращает лучшие '
+            'совпадения первыми.'
+        )
+
+    def test_03_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Робокоп'})
+        assert self.search_ids(client, self.TITLES_URL, 'робокоп') == [
+            titles[0]['id']
+        ], 'Проверьте, что изменённое произведение переиндексируется.'
+        assert self.search_ids(client, self.TITLES_URL, 'терминатор') == []
+        admin_client.delete(url)
+        assert self.search_ids(client, self.TITLES_URL, 'робокоп') == [], (
+            'Проверьте, что удалённое произведение убирается из индекса.'
+        )
+
+    def test_04_reviews_search_in_title(self, admin_client, admin,
+                                        user_client, user):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client
+        })
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert self.search_ids(admin_client, url, 'number 2') == [
+            reviews[1]['id']
+        ], f'Проверьте, что `{url}?search=` ищет по тексту Отзывов.'
+        other_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        assert self.search_ids(admin_client, other_url, 'review') == [], (
+            'Проверьте, что поиск Отзывов ограничен одним произведением.'
+        )
+
+    def test_05_python_backend(self, admin_client, admin, user_client, user):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client
+        })
+        backend = PythonSearchBackend()
+        assert backend.search(Title, ['крепк']) == [titles[1]['id']]
+        assert backend.search(
+            Review, ['number', '1'], scope=titles[0]['id']
+        ) == [reviews[0]['id']]
+        backend.remove(Review, reviews[0]['id'])
+        assert backend.search(Review, ['review']) == [reviews[1]['id']]
+        assert search(Title, '  ') == []
@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import TitleScore
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleStats:
+
+    STATS_URL_TEMPLATE = '/api/v1/titles/{title_id}/stats/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_stats(self, client, title_id):
+        response = client.get(
+            self.STATS_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            '`/api/v1/titles/{title_id}/stats/` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()
+
+    def test_01_stats_follow_reviews(self, client, admin_client, admin,
+                                     user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        stats = self.get_stats(client, title_id)
+        assert stats['count'] == 2
+        assert stats['mean'] == 5
+        assert stats['histogram'] == {
+            str(score): 2 if score == 5 else 0 for score in range(1, 11)
+        }, (
+            'Проверьте, что гистограмма содержит все оценки от 1 до 10.'
+        )
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        stats = self.get_stats(client, title_id)
+        assert (stats['count'], stats['mean']) == (2, 7), (
+            'Проверьте, что статистика учитывает изменение оценки.'
+        )
+        assert (stats['histogram']['5'], stats['histogram']['9']) == (1, 1)
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        stats = self.get_stats(client, title_id)
+        assert (stats['count'], stats['mean']) == (1, 9), (
+            'Проверьте, что статистика учитывает удаление Отзыва.'
+        )
+
+    def test_02_stats_without_reviews(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        stats = self.get_stats(client, titles[0]['id'])
+        assert stats['count'] == 0
+        assert stats['mean'] is None
+        response = client.get(self.STATS_URL_TEMPLATE.format(title_id=0))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что статистика несуществующего произведения '
+            'возвращает ответ со статусом 404.'
+        )
+        response = client.get(self.STATS_URL_TEMPLATE.format(title_id='abc'))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что статистика по нечисловому id возвращает ответ '
+            'со статусом 404.'
+        )
+
+    def test_03_stats_in_one_query(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        with CaptureQueriesContext(connection) as queries:
+            self.get_stats(client, titles[0]['id'])
+        assert len(queries) == 1, (
+            'Проверьте, что статистика произведения читается одним '
+            'запросом к счётчикам оценок.'
+        )
+
+    def test_04_recalculate_rebuilds_counters(self, client, admin_client,
+                                              admin, user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        TitleScore.objects.all().delete()
+        call_command('recalculate_ratings')
+        stats = self.get_stats(client, titles[0]['id'])
+        assert (stats['count'], stats['histogram']['5']) == (2, 2), (
+            'Проверьте, что `recalculate_ratings` пересобирает гистограммы.'
+        )
+
+    def test_05_title_delete_removes_counters(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not TitleScore.objects.filter(
+            title_id=titles[0]['id']
+        ).exists()
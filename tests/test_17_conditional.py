@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_reviews, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def assert_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+        )
+        assert response.has_header('Last-Modified')
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с совпавшим '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert len(queries) == 0, (
+            'Проверьте, что ответ 304 не выполняет запросов к БД.'
+        )
+        return etag
+
+    def assert_modified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения данных `{url}` возвращает '
+            'новый ответ.'
+        )
+
+    def test_01_titles(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        list_etag = self.assert_not_modified(client, self.TITLES_URL)
+        detail_etag = self.assert_not_modified(client, title_url)
+        other_etag = self.assert_not_modified(
+            client, f'{self.TITLES_URL}{titles[1]["id"]}/'
+        )
+        admin_client.patch(title_url, data={'name': 'Новое имя'})
+        self.assert_modified(client, self.TITLES_URL, list_etag)
+        self.assert_modified(client, title_url, detail_etag)
+        assert self.assert_not_modified(
+            client, f'{self.TITLES_URL}{titles[1]["id"]}/'
+        ) == other_etag, (
+            'Проверьте, что изменение произведения не меняет ETag других '
+            'произведений.'
+        )
+
+    def test_02_genres(self, client, admin_client):
+        etag = self.assert_not_modified(client, self.GENRES_URL)
+        admin_client.post(self.GENRES_URL, data={'name': 'Жанр', 'slug': 'g'})
+        self.assert_modified(client, self.GENRES_URL, etag)
+
+    def test_03_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        )
+        reviews_etag = self.assert_not_modified(client, reviews_url)
+        comments_etag = self.assert_not_modified(client, comments_url)
+        title_etag = self.assert_not_modified(
+            client, f'{self.TITLES_URL}{title_id}/'
+        )
+
+        create_single_comment(user_client, title_id, reviews[0]['id'], 'Да')
+        self.assert_modified(client, comments_url, comments_etag)
+        user_client.post(reviews_url, data={'text': 'Отзыв', 'score': 1})
+        self.assert_modified(client, reviews_url, reviews_etag)
+        self.assert_modified(
+            client, f'{self.TITLES_URL}{title_id}/', title_etag
+        )
+
+    def test_04_query_string_changes_etag(self, client, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        first = client.get(self.TITLES_URL)['ETag']
+        second = client.get(self.TITLES_URL, {'year': 1984})['ETag']
+        assert first != second, (
+            'Проверьте, что ETag зависит от параметров запроса.'
+        )
+
+    def test_05_etag_changes_after_commit(self, client, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        with transaction.atomic():
+            Review.objects.get(pk=reviews[0]['id']).delete()
+            assert client.get(url)['ETag'] == etag, (
+                'Проверьте, что версии кэшей меняются только после коммита: '
+                'иначе под новой версией закэшируются старые данные.'
+            )
+        assert client.get(url)['ETag'] != etag
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def get_without_queries(self, client, url, params=None):
+        client.get(url, params)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 0, (
+            f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+            'отдаётся из кэша ответов без запросов к БД.'
+        )
+        return response.json()
+
+    def test_01_titles_cached_for_anonymous(self, client, admin_client,
+                                            admin, user_client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        data = self.get_without_queries(client, self.TITLES_URL)
+        assert data == user_client.get(self.TITLES_URL).json()
+        self.get_without_queries(
+            client, f'{self.TITLES_URL}{titles[0]["id"]}/'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            user_client.get(self.TITLES_URL)
+        assert len(queries) > 0, (
+            'Проверьте, что ответы авторизованным пользователям не '
+            'берутся из кэша.'
+        )
+
+    def test_02_query_params_normalized(self, client, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        client.get(self.TITLES_URL, {'year': 1984, 'limit': 1})
+        with CaptureQueriesContext(connection) as queries:
+            client.get(f'{self.TITLES_URL}?limit=1&year=1984')
+        assert len(queries) == 0, (
+            'Проверьте, что ключ кэша не зависит от порядка параметров.'
+        )
+        data = self.get_without_queries(
+            client, self.TITLES_URL, {'year': 1988}
+        )
+        assert [title['year'] for title in data['results']] == [1988]
+
+    def test_03_invalidated_on_changes(self, client, admin_client, admin,
+                                       user_client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = f'{self.TITLES_URL}{titles[1]["id"]}/'
+        assert self.get_without_queries(client, title_url)['rating'] is None
+        create_single_review(user_client, titles[1]['id'], 'Текст', 7)
+        assert client.get(title_url).json()['rating'] == 7, (
+            'Проверьте, что новый Отзыв сбрасывает кэш ответа произведения.'
+        )
+
+        self.get_without_queries(client, self.GENRES_URL)
+        admin_client.post(self.GENRES_URL, data={'name': 'Жанр', 'slug': 'g'})
+        slugs = [
+            genre['slug']
+            for genre in client.get(self.GENRES_URL).json()['results']
+        ]
+        assert 'g' in slugs, (
+            'Проверьте, что новый Жанр сбрасывает кэш ответа списка Жанров.'
+        )
+
+    def test_04_cache_depends_on_host(self, client, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        params = {'limit': 1}
+        poisoned = client.get(
+            self.TITLES_URL, params, HTTP_HOST='evil.example'
+        ).json()
+        assert poisoned['next'].startswith('http://evil.example/')
+        data = client.get(self.TITLES_URL, params).json()
+        assert data['next'].startswith('http://testserver/'), (
+            'Проверьте, что ключ кэша ответов зависит от заголовка Host: '
+            'ссылки next/previous в ответе абсолютные.'
+        )
+        etag = client.get(self.TITLES_URL, params)['ETag']
+        response = client.get(
+            self.TITLES_URL, params, HTTP_HOST='evil.example',
+            HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
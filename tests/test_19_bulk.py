@@ -0,0 +1,150 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, Title, TitleGenre
+from tests.utils import create_categories, create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Bulk:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_BULK_URL = '/api/v1/titles/bulk/'
+    GENRES_URL = '/api/v1/genres/'
+    GENRES_BULK_URL = '/api/v1/genres/bulk/'
+
+    def titles_data(self, genres, categories, count):
+        return [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[0]['slug'], genres[1]['slug']],
+                'category': categories[idx % 2]['slug'],
+                'description': f'Описание {idx}'
+            }
+            for idx in range(count)
+        ]
+
+    def test_01_titles_bulk_create(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.titles_data(genres, categories, 3)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                self.TITLES_URL, data=data, format='json'
+            )
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_title"')
+        ]
+        # Без RETURNING (SQLite) произведения сохраняются по одному.
+        expected = (
+            1 if connection.features.can_return_rows_from_bulk_insert
+            else len(data)
+        )
+        assert len(inserts) == expected, (
+            'Проверьте, что на backend с RETURNING произведения списка '
+            'создаются одним INSERT.'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.TITLES_URL}` '
+            'со списком произведений возвращает ответ со статусом 201.'
+        )
+        results = response.json()
+        assert [title['name'] for title in results] == [
+            title['name'] for title in data
+        ], 'Проверьте, что в ответе результат для каждого элемента.'
+        assert all(len(title['genre']) == 2 for title in results)
+        assert sorted(title['id'] for title in results) == list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+        assert TitleGenre.objects.count() == 6
+        search = admin_client.get(self.TITLES_URL, {'search': 'описание'})
+        assert search.json()['count'] == 3, (
+            'Проверьте, что созданные списком произведения индексируются.'
+        )
+
+    def test_02_titles_bulk_create_all_or_nothing(self, admin_client,
+                                                  user_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.titles_data(genres, categories, 3)
+        data[1]['genre'] = ['unknown']
+        data[2]['year'] = 'год'
+        response = admin_client.post(self.TITLES_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            'Проверьте, что ошибки возвращаются для каждого элемента.'
+        )
+        assert 'genre' in errors[1] and 'year' in errors[2]
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в одном элементе ничего не создаётся.'
+        )
+        response = user_client.post(
+            self.TITLES_URL, data=data[:1], format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_titles_bulk_patch(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        data = [
+            {'id': titles[0]['id'], 'name': 'Терминатор 2'},
+            {'id': titles[1]['id'], 'genre': [genres[0]['slug']]},
+        ]
+        response = admin_client.patch(
+            self.TITLES_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что PATCH-запрос администратора к '
+            f'`{self.TITLES_BULK_URL}` возвращает ответ со статусом 200.'
+        )
+        results = response.json()
+        assert results[0]['name'] == 'Терминатор 2'
+        assert [genre['slug'] for genre in results[1]['genre']] == [
+            genres[0]['slug']
+        ]
+        detail = client.get(f'{self.TITLES_URL}{titles[1]["id"]}/').json()
+        assert detail['genre'] == results[1]['genre']
+
+        response = admin_client.patch(
+            self.TITLES_BULK_URL,
+            data=[{'id': titles[0]['id'], 'name': 'X'}, {'id': 0}],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'id' in response.json()[1]
+        assert Title.objects.get(pk=titles[0]['id']).name == 'Терминатор 2'
+
+    def test_04_genres_bulk(self, client, admin_client):
+        data = [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'}
+        ]
+        response = admin_client.post(self.GENRES_URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json() == data
+        assert client.get(self.GENRES_URL).json()['count'] == 2, (
+            'Проверьте, что массовое создание сбрасывает кэш каталога.'
+        )
+        response = admin_client.post(
+            self.GENRES_URL, data=data[:1] * 2, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = admin_client.patch(
+            self.GENRES_BULK_URL,
+            data=[{'slug': 'drama', 'name': 'Драмы'}],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert Genre.objects.get(slug='drama').name == 'Драмы'
+        names = [
+            genre['name'] for genre in client.get(self.GENRES_URL).json()[
+                'results'
+            ]
+        ]
+        assert 'Драмы' in names
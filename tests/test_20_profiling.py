@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api.profiling import reset_report
+from tests.utils import create_reviews
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_QUERY_BUDGET = 3
+    reset_report()
+    yield
+    reset_report()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Profiling:
+
+    PROFILING_URL = '/api/v1/profiling/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_records_routes(self, profiling, admin_client, admin,
+                               user_client, capsys):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        user_client.get(url)
+        response = admin_client.get(self.PROFILING_URL)
+        assert response.status_code == HTTPStatus.OK
+        routes = response.json()['routes']
+        assert 'GET title_reviews-list' in routes, (
+            'Проверьте, что профиль собирается по имени маршрута.'
+        )
+        stats = routes['GET title_reviews-list']
+        assert stats['requests'] == 1
+        for name in ('wall_ms', 'db_ms', 'serializer_ms', 'queries',
+                     'response_bytes'):
+            assert stats[name]['count'] == 1, (
+                f'Проверьте, что профиль содержит гистограмму `{name}`.'
+            )
+        assert stats['queries']['sum'] > 0
+        assert stats['serializer_ms']['sum'] > 0
+        assert stats['response_bytes']['sum'] == len(user_client.get(
+            url
+        ).content)
+
+        call_command('profiling_report')
+        assert 'GET title_reviews-list' in capsys.readouterr().out, (
+            'Проверьте, что `profiling_report` выводит маршруты.'
+        )
+
+    def test_02_query_budget(self, profiling, admin_client, admin):
+        create_reviews(admin_client, {admin: admin_client})
+        response = admin_client.get('/api/v1/titles/')
+        assert response.has_header('X-Query-Budget-Exceeded'), (
+            'Проверьте, что запрос сверх бюджета запросов к БД отмечается.'
+        )
+        flagged = admin_client.get(self.PROFILING_URL).json()['flagged']
+        assert any(item['route'] == 'GET titles-list' for item in flagged)
+
+    def test_03_admin_only(self, profiling, client, user_client):
+        assert client.get(self.PROFILING_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.PROFILING_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_04_disabled_by_default(self, client):
+        response = client.get('/api/v1/genres/')
+        assert not response.has_header('X-Query-Budget-Exceeded')
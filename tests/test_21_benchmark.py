@@ -0,0 +1,27 @@
+import pytest
+
+from api.benchmark import ROUTES, percentile, run_benchmark
+from reviews.datagen import generate_dataset
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Benchmark:
+
+    def test_01_run_benchmark(self):
+        generate_dataset(titles=10, reviews=30, users=5, comments=10)
+        results = run_benchmark(requests=2, warmup=1)
+        assert set(results) == {name for name, _, _ in ROUTES}, (
+            'Проверьте, что бенчмарк замеряет все маршруты.'
+        )
+        for name, stats in results.items():
+            assert stats['statuses'] == [200], (
+                f'Проверьте, что запросы замера `{name}` успешны.'
+            )
+            assert stats['p50_ms'] <= stats['p99_ms'] <= stats['max_ms']
+        assert results['titles-stats']['max_queries'] == 1
+
+    def test_02_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 90) == 7
@@ -0,0 +1,91 @@
+import os
+import random
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F, Max, Min
+
+from reviews.datagen import BASE_SHARD, generate_dataset, zipf_counts
+from reviews.models import Comment, Review, Title, TitleGenre, TitleScore
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22GenerateData:
+
+    def test_01_generate_in_database(self):
+        call_command(
+            'generate_data', '--titles', '50', '--reviews', '600',
+            '--users', '40', '--comments', '200', '--shards', '3',
+            '--batch-size', '64'
+        )
+        assert Title.objects.count() == 50
+        assert Review.objects.count() == 600
+        assert Comment.objects.count() == 200
+        assert User.objects.count() == 40
+        assert sum(
+            TitleScore.objects.values_list('count', flat=True)
+        ) == 600, 'Проверьте, что после генерации пересчитываются рейтинги.'
+        per_title = Counter(
+            TitleGenre.objects.values_list('title_id', flat=True)
+        )
+        assert len(per_title) == 50 and max(per_title.values()) <= 4, (
+            'Проверьте, что у каждого произведения от одного до четырёх '
+            'Жанров.'
+        )
+        reviews = sorted(
+            Title.objects.annotate(
+                reviews_count=Count('reviews')
+            ).values_list('reviews_count', flat=True),
+            reverse=True
+        )
+        assert sum(reviews[:5]) > sum(reviews[-25:]), (
+            'Проверьте, что Отзывы распределены по закону Ципфа.'
+        )
+        self.assert_dates_spread()
+        Title.objects.create(name='Новое', year=2000)
+
+    def assert_dates_spread(self):
+        dates = Review.objects.aggregate(
+            first=Min('pub_date'), last=Max('pub_date')
+        )
+        assert dates['last'] - dates['first'] > timedelta(days=30), (
+            'Проверьте, что даты Отзывов распределены по времени, а не '
+            'совпадают с моментом генерации.'
+        )
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')
+        ).exists(), 'Проверьте, что Комментарий не старше своего Отзыва.'
+
+    def test_02_generate_appends(self):
+        generate_dataset(titles=5, reviews=10, users=5, seed=1)
+        generate_dataset(titles=5, reviews=10, users=5, seed=2)
+        assert Title.objects.count() == 10
+        assert Review.objects.count() == 20
+
+    def test_03_csv_shards_load(self, tmp_path):
+        counts = generate_dataset(
+            titles=30, reviews=200, users=20, comments=50, shards=4,
+            workers=2, directory=str(tmp_path)
+        )
+        assert Title.objects.count() == 0, (
+            'Проверьте, что в csv режиме данные не пишутся в БД.'
+        )
+        shards = sorted(os.listdir(tmp_path))
+        assert shards[-1] == BASE_SHARD and len(shards) == 5
+        for shard in [BASE_SHARD, *shards[:-1]]:
+            call_command('loadcsv', str(tmp_path / shard), '--all')
+        assert Title.objects.count() == counts['reviews.Title'] == 30
+        assert Review.objects.count() == counts['reviews.Review'] == 200
+        assert Comment.objects.count() == counts['reviews.Comment'] == 50
+        assert TitleGenre.objects.count() == counts['reviews.TitleGenre']
+        self.assert_dates_spread()
+
+    def test_04_zipf_counts(self):
+        counts = zipf_counts(1000, 100, 1.1, 30, random.Random(0))
+        assert sum(counts) == 1000
+        assert max(counts) <= 30
+        with pytest.raises(ValueError):
+            generate_dataset(titles=2, reviews=5, users=2)
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23CanEdit:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_can_edit_flags(self, client, admin_client, user, user_client,
+                               moderator, moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        expected = (
+            (client, {user.username: False, moderator.username: False}),
+            (user_client, {user.username: True, moderator.username: False}),
+            (moderator_client, {user.username: True, moderator.username: True}),
+            (admin_client, {user.username: True, moderator.username: True}),
+        )
+        for api_client, flags in expected:
+            results = api_client.get(url).json()['results']
+            assert {
+                review['author']: review['can_edit'] for review in results
+            } == flags, (
+                f'Проверьте, что поле `can_edit` в ответе `{url}` '
+                'совпадает с правом на изменение Отзыва.'
+            )
+
+    def test_02_can_edit_without_queries(self, admin_client, user,
+                                         user_client, moderator,
+                                         moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(url)
+        assert not any(
+            'users_user' in query['sql'] and 'JOIN' not in query['sql']
+            for query in context.captured_queries[1:]
+        ), (
+            'Проверьте, что `can_edit` и пермишены не загружают '
+            'авторов отдельными запросами.'
+        )
+        detail_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[1]['id']
+        )
+        response = user_client.patch(detail_url, data={'text': 'Чужой'})
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_etag_depends_on_user(self, admin_client, user, user_client,
+                                     moderator, moderator_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = user_client.get(url)['ETag']
+        response = moderator_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка Отзывов зависит от пользователя, '
+            'ведь `can_edit` у разных пользователей разный.'
+        )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
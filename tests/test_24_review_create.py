@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.serializers import ReviewSerializer
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+PARALLEL_REQUESTS = 4
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewCreate:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    DUPLICATE_MESSAGE = (
+        'Нельзя делать повторный Отзыв одного и того же произведения'
+    )
+
+    def test_01_duplicate_review_queries(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        data = {'text': 'Отзыв', 'score': 7}
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            query['sql'].startswith('SELECT (1) AS "a"')
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что перед созданием Отзыва не проверяется '
+            'существование повторного Отзыва отдельным запросом.'
+        )
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': [self.DUPLICATE_MESSAGE]
+        }, (
+            'Проверьте, что повторный Отзыв возвращает прежнее сообщение '
+            'об ошибке.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что повторный Отзыв не меняет рейтинг.'
+        )
+
+    def test_02_interleaved_duplicate_reviews(self, admin_client,
+                                              user_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        create = ReviewSerializer.create
+        rival = []
+
+        def create_after_rival(serializer, validated_data):
+            # Второй запрос уже прошёл валидацию, а первый успевает
+            # создать Отзыв до его INSERT.
+            if not rival:
+                rival.append(None)
+                rival[0] = user_client.post(
+                    url, data={'text': 'Первый', 'score': 5}
+                )
+            return create(serializer, validated_data)
+
+        monkeypatch.setattr(ReviewSerializer, 'create', create_after_rival)
+        response = user_client.post(url, data={'text': 'Второй', 'score': 9})
+        assert rival[0].status_code == HTTPStatus.CREATED
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что Отзыв, опоздавший после валидации, получает '
+            'ответ со статусом 400, а не 500.'
+        )
+        assert response.json() == {
+            'non_field_errors': [self.DUPLICATE_MESSAGE]
+        }
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 1
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (5, 1)
+
+    @pytest.mark.skipif(
+        connection.vendor == 'sqlite',
+        reason='SQLite не допускает параллельной записи'
+    )
+    def test_03_parallel_duplicate_reviews(self, admin_client, token_user):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        barrier = threading.Barrier(PARALLEL_REQUESTS)
+
+        def post(idx):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            try:
+                barrier.wait()
+                return client.post(
+                    url, data={'text': f'Отзыв {idx}', 'score': 5}
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(PARALLEL_REQUESTS) as executor:
+            statuses = sorted(executor.map(post, range(PARALLEL_REQUESTS)))
+        assert statuses == [HTTPStatus.CREATED] + [
+            HTTPStatus.BAD_REQUEST
+        ] * (PARALLEL_REQUESTS - 1), (
+            'Проверьте, что из параллельных повторных Отзывов создаётся '
+            'один, а остальные получают ответ со статусом 400.'
+        )
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 1
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.rating_count == 1
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_title_fields(self, client, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.TITLES_URL, {'fields': 'id,name,rating'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                f'Проверьте, что `{self.TITLES_URL}?fields=` оставляет '
+                'в ответе только перечисленные поля.'
+            )
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_genre' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что без полей genre и category их данные не '
+            'загружаются.'
+        )
+        assert '"description"' not in sql, (
+            'Проверьте, что в запросе только колонки запрошенных полей.'
+        )
+
+    def test_02_title_expand(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        url = self.TITLES_URL + f'{titles[0]["id"]}/'
+        title = client.get(url, {'expand': ''}).json()
+        assert sorted(title['genre']) == sorted(titles[0]['genre']), (
+            'Проверьте, что без expand Жанры отдаются слагами.'
+        )
+        assert title['category'] == titles[0]['category']
+        title = client.get(
+            url, {'fields': 'name,category', 'expand': 'category'}
+        ).json()
+        assert title == {
+            'name': titles[0]['name'],
+            'category': next(
+                category for category in categories
+                if category['slug'] == titles[0]['category']
+            ),
+        }, 'Проверьте, что `?expand=category` разворачивает Категорию.'
+        assert 'description' in client.get(url).json(), (
+            'Проверьте, что без параметров ответ не меняется.'
+        )
+
+    def test_03_review_fields_and_expand(self, client, admin_client, user,
+                                         user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        reviews = user_client.get(
+            url, {'fields': 'id,score,can_edit'}
+        ).json()['results']
+        assert [set(review) for review in reviews] == [
+            {'id', 'score', 'can_edit'}
+        ]
+        assert reviews[0]['can_edit'] is True
+        with CaptureQueriesContext(connection) as context:
+            reviews = client.get(
+                url, {'fields': 'text,author', 'expand': 'author'}
+            ).json()['results']
+        assert reviews[0]['author'] == {
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'bio': user.bio,
+        }, 'Проверьте, что `?expand=author` разворачивает автора.'
+        assert len(context.captured_queries) == 3, (
+            'Проверьте, что автор загружается в том же запросе.'
+        )
+        assert '"email"' not in context.captured_queries[-1]['sql']
+
+    def test_04_user_fields(self, admin_client, user):
+        response = admin_client.get(
+            self.USERS_URL, {'fields': 'username,role'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert {'username': user.username, 'role': user.role} in (
+            response.json()['results']
+        )
+        for item in response.json()['results']:
+            assert set(item) == {'username', 'role'}
+
+    @pytest.mark.parametrize('params', (
+        {'fields': 'id,password'},
+        {'expand': 'rating'},
+    ))
+    def test_05_unknown_fields(self, client, admin_client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестные поля в `?fields=` и `?expand=` '
+            'возвращают ответ со статусом 400.'
+        )
+        response = admin_client.get(self.USERS_URL, params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST